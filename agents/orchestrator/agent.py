@@ -10,27 +10,43 @@ Uses LangGraph for intent routing logic.
 """
 from __future__ import annotations
 
-import json
-import sys
-from pathlib import Path
+import hashlib
+import re
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Annotated, Any, TypedDict
 import uuid
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 import httpx
 from a2a.client import A2AClient
-from a2a.types import MessageSendParams, SendMessageRequest
+from a2a.types import (
+    Message,
+    MessageSendConfiguration,
+    MessageSendParams,
+    SendMessageRequest,
+    SendMessageResponse,
+    Task,
+    TextPart,
+)
 from a2a.utils import new_agent_text_message
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
+from utils.cache import SemanticCache, TTLCache
 from utils.config import get_settings
 from utils.logging import get_logger
+from utils.serialization import dumps
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -42,48 +58,151 @@ class OrchestratorState(TypedDict):
     delegated_to: str | None
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Response cache
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Final answers keyed by normalized query. Runs that reached the Order Agent are
+# never stored: order state changes and cancellations are not idempotent.
+RESPONSE_CACHE: TTLCache[str, str] = TTLCache(
+    maxsize=settings.response_cache_size, ttl=settings.response_cache_ttl
+)
+# Optional second tier that also matches rephrasings of a cached query.
+SEMANTIC_CACHE: SemanticCache | None = (
+    SemanticCache(
+        embed=OpenAIEmbeddings(
+            model=settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+            api_key=settings.openai_api_key,
+        ).aembed_query,
+        threshold=settings.semantic_cache_threshold,
+        ttl=settings.response_cache_ttl,
+    )
+    if settings.semantic_cache_enabled
+    else None
+)
+_NON_CACHEABLE_TOOLS = frozenset({"ask_order_agent"})
+
+
+def response_cache_key(query: str) -> str:
+    """Hash the query after case-folding and collapsing whitespace."""
+    normalized = " ".join(query.casefold().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def is_cacheable_run(messages: list[BaseMessage]) -> bool:
+    """Return False for follow-up turns or runs that touched a non-idempotent agent."""
+    if sum(isinstance(msg, HumanMessage) for msg in messages) > 1:
+        # The answer depends on earlier turns of the conversation.
+        return False
+    return not any(
+        call["name"] in _NON_CACHEABLE_TOOLS
+        for msg in messages
+        if isinstance(msg, AIMessage)
+        for call in msg.tool_calls
+    )
+
+
+async def get_cached_response(query: str) -> str | None:
+    """Return a cached answer for the query (exact match first, then semantic)."""
+    key = response_cache_key(query)
+    cached = RESPONSE_CACHE.get(key)
+    if cached is None and SEMANTIC_CACHE is not None:
+        try:
+            cached = await SEMANTIC_CACHE.lookup(key, query)
+        except Exception as e:
+            logger.warning("semantic_cache_error", error=str(e))
+    return cached
+
+
+def reply_text(messages: list[BaseMessage]) -> str:
+    """Return the text of the newest AI reply with content in the latest turn."""
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            break
+        if isinstance(msg, AIMessage) and msg.content:
+            content = msg.content
+            if isinstance(content, list):
+                return " ".join(
+                    c["text"] for c in content if isinstance(c, dict) and c.get("type") == "text"
+                )
+            return content
+    return ""
+
+
+async def store_response(query: str, response: str, messages: list[BaseMessage]) -> None:
+    """Cache the final answer of a graph run if the run is safe to replay."""
+    if not response or not is_cacheable_run(messages):
+        return
+    key = response_cache_key(query)
+    RESPONSE_CACHE.set(key, response)
+    if SEMANTIC_CACHE is not None:
+        try:
+            await SEMANTIC_CACHE.insert(key, query, response)
+        except Exception as e:
+            logger.warning("semantic_cache_error", error=str(e))
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # A2A Delegation Tools
 # ─────────────────────────────────────────────────────────────────────────────
 
+_HTTPX_CLIENT: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled httpx client shared by all A2A delegations."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is None or _HTTPX_CLIENT.is_closed:
+        _HTTPX_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+    return _HTTPX_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client (called on server shutdown)."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is not None:
+        await _HTTPX_CLIENT.aclose()
+        _HTTPX_CLIENT = None
+
+
+def _extract_text(response: SendMessageResponse) -> str:
+    """Join the text parts of an A2A reply (task artifacts, else status message)."""
+    result = getattr(response.root, "result", None)
+    if isinstance(result, Message):
+        parts = result.parts
+    elif isinstance(result, Task):
+        if result.artifacts:
+            parts = [part for artifact in result.artifacts for part in artifact.parts]
+        elif result.status.message:
+            parts = result.status.message.parts
+        else:
+            parts = []
+    else:
+        return ""
+    return "".join(part.root.text for part in parts if isinstance(part.root, TextPart))
+
+
 async def _delegate_to_agent(agent_url: str, query: str, agent_name: str) -> str:
     """Send a task to a remote A2A agent and return its response."""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as httpx_client:
-            client = A2AClient(
-                httpx_client = httpx_client, 
-                url = agent_url
-            )
-            request = SendMessageRequest(
-                id=str(uuid.uuid4()), 
-                params=MessageSendParams(
-                    message=new_agent_text_message(query),
-                )
+        client = A2AClient(httpx_client=_get_client(), url=agent_url)
+        request = SendMessageRequest(
+            id=str(uuid.uuid4()),
+            params=MessageSendParams(
+                message=new_agent_text_message(query),
+                # Agents stream tokens as status messages that end up in the
+                # task history; only the final artifact is needed here.
+                configuration=MessageSendConfiguration(history_length=1),
             )
-            response = await client.send_message(request)
-
-            # Extract text from response
-            result_text = ""
-            if hasattr(response, "root"):
-                resp_root = response.root
-                if hasattr(resp_root, "result"):
-                    result = resp_root.result
-                    # Check for artifacts
-                    if hasattr(result, "artifacts") and result.artifacts:
-                        for artifact in result.artifacts:
-                            if hasattr(artifact, "parts"):
-                                for part in artifact.parts:
-                                    if hasattr(part, "root") and hasattr(part.root, "text"):
-                                        result_text += part.root.text
-                    # Check for message in status
-                    elif hasattr(result, "status") and result.status and result.status.message:
-                        msg = result.status.message
-                        if hasattr(msg, "parts"):
-                            for part in msg.parts:
-                                if hasattr(part, "root") and hasattr(part.root, "text"):
-                                    result_text += part.root.text
-
-            return result_text if result_text else f"{agent_name} yanıt vermedi."
+        )
+        response = await client.send_message(request)
+
+        result_text = _extract_text(response)
+        return result_text if result_text else f"{agent_name} yanıt vermedi."
 
     except Exception as e:
         logger.error("a2a_delegation_error", agent=agent_name, error=str(e))
@@ -134,45 +253,49 @@ async def ask_search_agent(query: str) -> str:
     return result
 
 
+# Static per process (agent URLs come from settings), so serialized once.
+_CAPABILITIES_JSON = dumps({
+    "agents": [
+        {
+            "name": "Product Agent",
+            "url": settings.product_agent_url,
+            "capabilities": [
+                "Ürün arama ve filtreleme",
+                "Ürün detayları ve özellikler",
+                "Stok ve fiyat kontrolü",
+                "Ürün önerileri",
+                "Web'de ürün araması",
+            ],
+        },
+        {
+            "name": "Order Agent",
+            "url": settings.order_agent_url,
+            "capabilities": [
+                "Sipariş durum takibi",
+                "Kargo takip bilgisi",
+                "Sipariş iptali",
+                "Müşteri profili ve sadakat puanları",
+                "Geçmiş siparişler",
+            ],
+        },
+        {
+            "name": "Search Agent",
+            "url": settings.search_agent_url,
+            "capabilities": [
+                "Web araması",
+                "Fiyat karşılaştırması (Trendyol, Hepsiburada, Amazon)",
+                "Ürün incelemeleri",
+                "Trend ürün analizi",
+            ],
+        },
+    ]
+})
+
+
 @tool
 async def get_agent_capabilities() -> str:
     """Mevcut tüm uzman ajanların yeteneklerini ve hangi konularda yardımcı olabileceklerini listele."""
-    return json.dumps({
-        "agents": [
-            {
-                "name": "Product Agent",
-                "url": settings.product_agent_url,
-                "capabilities": [
-                    "Ürün arama ve filtreleme",
-                    "Ürün detayları ve özellikler",
-                    "Stok ve fiyat kontrolü",
-                    "Ürün önerileri",
-                    "Web'de ürün araması",
-                ],
-            },
-            {
-                "name": "Order Agent",
-                "url": settings.order_agent_url,
-                "capabilities": [
-                    "Sipariş durum takibi",
-                    "Kargo takip bilgisi",
-                    "Sipariş iptali",
-                    "Müşteri profili ve sadakat puanları",
-                    "Geçmiş siparişler",
-                ],
-            },
-            {
-                "name": "Search Agent",
-                "url": settings.search_agent_url,
-                "capabilities": [
-                    "Web araması",
-                    "Fiyat karşılaştırması (Trendyol, Hepsiburada, Amazon)",
-                    "Ürün incelemeleri",
-                    "Trend ürün analizi",
-                ],
-            },
-        ]
-    }, ensure_ascii=False)
+    return _CAPABILITIES_JSON
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -191,7 +314,8 @@ Yönlendirme Kuralları:
 - "ürün ara", "öneri", "özellik", "stok", "catalog" → Product Agent
 - "sipariş", "kargo", "takip", "iptal", "iade", "ord-" → Order Agent
 - "fiyat karşılaştır", "inceleme", "trend", "web'de ara", "piyasa" → Search Agent
-- Karmaşık sorularda birden fazla ajana sor ve cevapları birleştir
+- Karmaşık sorularda birden fazla ajana sor ve cevapları birleştir; birbirinden bağımsız
+  ajan çağrılarını aynı adımda birlikte yap (paralel çalıştırılırlar)
 
 Davranış Kuralları:
 - Her zaman Türkçe yanıt ver
@@ -200,9 +324,120 @@ Davranış Kuralları:
 - Gerekirse proaktif önerilerde bulun
 - Hata durumunda müşteriyi bilgilendir ve alternatif sun"""
 
+# Built once and kept byte-identical across calls so the provider's automatic
+# prompt-prefix caching can reuse it.
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Direct keyword routing
+# ─────────────────────────────────────────────────────────────────────────────
+
+# The routing rules of SYSTEM_PROMPT, compiled into one regex whose named groups
+# tag the agent. A query that hits exactly one agent is delegated without an
+# LLM call; anything ambiguous (several agents or none) goes through the graph.
+_ROUTING_RULES = {
+    "ask_product_agent": ("ürün ara", "öneri", "özellik", "stok", "catalog", "katalog"),
+    "ask_order_agent": ("sipariş", "kargo", "takip", "iptal", "iade", "ord-"),
+    "ask_search_agent": ("fiyat karşılaştır", "inceleme", "trend", "web'de ara", "piyasa"),
+}
+_ROUTER = re.compile(
+    "|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, keywords))})"
+        for name, keywords in _ROUTING_RULES.items()
+    )
+)
+_DIRECT_TOOLS = {
+    "ask_product_agent": ask_product_agent,
+    "ask_order_agent": ask_order_agent,
+    "ask_search_agent": ask_search_agent,
+}
+
+
+def _fold(text: str) -> str:
+    """Lower-case with the Turkish dotted capital İ mapped to a plain i."""
+    return text.replace("İ", "i").lower()
+
 
+def match_direct_route(query: str) -> str | None:
+    """Return the single delegation tool the routing rules point at, if any."""
+    if not settings.direct_routing_enabled:
+        return None
+    tags = {m.lastgroup for m in _ROUTER.finditer(_fold(query))}
+    return tags.pop() if len(tags) == 1 else None
+
+
+def mentions_orders(query: str) -> bool:
+    """Tell whether the query touches orders, whose agent can change state."""
+    folded = _fold(query)
+    return any(k in folded for k in _ROUTING_RULES["ask_order_agent"])
+
+
+async def answer_directly(query: str) -> str | None:
+    """Delegate an obvious single-intent query straight to its agent."""
+    tool_name = match_direct_route(query)
+    if tool_name is None:
+        return None
+    logger.info("direct_route", tool=tool_name)
+    return await _DIRECT_TOOLS[tool_name].ainvoke({"query": query})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Plan templates
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Routing keywords from SYSTEM_PROMPT. The set present in a query is the key
+# under which the delegation plan chosen by the first LLM turn is remembered.
+_INTENT_KEYWORDS = (
+    "sipariş", "kargo", "takip", "iptal", "iade", "ord-",
+    "ürün", "öneri", "özellik", "stok",
+    "fiyat", "karşılaştır", "inceleme", "yorum", "trend", "piyasa",
+)
+_DELEGATION_TOOLS = frozenset({"ask_product_agent", "ask_order_agent", "ask_search_agent"})
+PLAN_TEMPLATES: TTLCache[tuple[str, ...], tuple[str, ...]] = TTLCache(maxsize=256, ttl=3600.0)
+
+
+def _intent_key(messages: list[BaseMessage]) -> tuple[str, ...]:
+    """Return the intent keywords of a fresh single-question conversation."""
+    if len(messages) != 1 or not isinstance(messages[0], HumanMessage):
+        return ()
+    content = messages[0].content
+    if not isinstance(content, str):
+        return ()
+    folded = _fold(content)
+    return tuple(k for k in _INTENT_KEYWORDS if k in folded)
+
+
+def _record_plan(messages: list[BaseMessage], response: AIMessage) -> None:
+    """Remember which agents the LLM delegated to for this kind of query.
+
+    A replayed plan sends the whole query to each agent once, so a turn that
+    asked one agent several times with split arguments is not recorded.
+    """
+    key = _intent_key(messages)
+    names = tuple(call["name"] for call in response.tool_calls)
+    if (
+        key
+        and names
+        and len(set(names)) == len(names)
+        and all(name in _DELEGATION_TOOLS for name in names)
+    ):
+        PLAN_TEMPLATES.set(key, names)
+
+
+def _match_plan(messages: list[BaseMessage]) -> tuple[str, ...] | None:
+    if not settings.plan_cache_enabled:
+        return None
+    key = _intent_key(messages)
+    return PLAN_TEMPLATES.get(key) if key else None
+
+
+@lru_cache(maxsize=1)
 def build_orchestrator() -> Any:
-    """Build and return the compiled LangGraph orchestrator."""
+    """Build and return the compiled LangGraph orchestrator.
+
+    The graph is built once per process and shared by every caller.
+    """
     tools = [
         ask_product_agent,
         ask_order_agent,
@@ -215,8 +450,18 @@ def build_orchestrator() -> Any:
         temperature=settings.llm_temperature,
         max_tokens=settings.llm_max_tokens,
         api_key=settings.openai_api_key,
-    ).bind_tools(tools)
+    ).bind_tools(tools, parallel_tool_calls=True)
+    # Picking which agent(s) to ask is cheap; only synthesis over tool results
+    # needs the main model.
+    router_llm = ChatOpenAI(
+        model=settings.router_llm_model,
+        temperature=0,
+        max_tokens=settings.llm_max_tokens,
+        api_key=settings.openai_api_key,
+    ).bind_tools(tools, parallel_tool_calls=True)
 
+    # ToolNode awaits all tool calls of one model turn with asyncio.gather, so
+    # delegations emitted together cost max(latency) rather than the sum.
     tool_node = ToolNode(tools)
 
     def should_continue(state: OrchestratorState) -> str:
@@ -226,16 +471,94 @@ def build_orchestrator() -> Any:
         return END
 
     async def call_model(state: OrchestratorState) -> dict[str, Any]:
-        from langchain_core.messages import SystemMessage
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + state["messages"]
-        response = await llm.ainvoke(messages)
+        messages = [_SYSTEM_MSG] + state["messages"]
+        model = llm if isinstance(state["messages"][-1], ToolMessage) else router_llm
+        response = await model.ainvoke(messages)
+        if response.tool_calls:
+            _record_plan(state["messages"], response)
         return {"messages": [response], "delegated_to": None}
 
+    def route_start(state: OrchestratorState) -> str:
+        return "replay_plan" if _match_plan(state["messages"]) else "orchestrator"
+
+    def replay_plan(state: OrchestratorState) -> dict[str, Any]:
+        """Skip the planning LLM call by re-issuing a remembered delegation plan."""
+        query = state["messages"][0].content
+        names = _match_plan(state["messages"]) or ()
+        logger.info("plan_template_hit", tools=names)
+        plan = AIMessage(
+            content="",
+            tool_calls=[
+                {"name": name, "args": {"query": query}, "id": f"call_{uuid.uuid4().hex}"}
+                for name in names
+            ],
+        )
+        return {"messages": [plan], "delegated_to": None}
+
     graph = StateGraph(OrchestratorState)
     graph.add_node("orchestrator", call_model)
+    graph.add_node("replay_plan", replay_plan)
     graph.add_node("tools", tool_node)
-    graph.add_edge(START, "orchestrator")
+    graph.add_conditional_edges(
+        START, route_start, {"replay_plan": "replay_plan", "orchestrator": "orchestrator"}
+    )
     graph.add_conditional_edges("orchestrator", should_continue, {"tools": "tools", END: END})
+    graph.add_edge("replay_plan", "tools")
     graph.add_edge("tools", "orchestrator")
 
-    return graph.compile()
+    # State is kept per thread (session) so follow-up turns only send the new
+    # message. InMemorySaver is per process; swap in a persistent saver when
+    # running several workers. keep_thread() bounds how many threads it holds.
+    checkpointer = InMemorySaver() if settings.conversation_memory_enabled else None
+    return graph.compile(checkpointer=checkpointer)
+
+
+def thread_config(thread_id: str) -> dict[str, Any]:
+    """Return the run config that selects a conversation thread."""
+    return {"configurable": {"thread_id": thread_id}}
+
+
+# Threads held by the checkpointer, least recently used first.
+_THREADS: OrderedDict[str, None] = OrderedDict()
+
+
+async def keep_thread(thread_id: str) -> None:
+    """Mark the thread as used and drop the least recently used ones beyond the cap."""
+    agent = build_orchestrator()
+    if agent.checkpointer is None:
+        return
+    _THREADS[thread_id] = None
+    _THREADS.move_to_end(thread_id)
+    while len(_THREADS) > settings.conversation_max_threads:
+        evicted, _ = _THREADS.popitem(last=False)
+        await agent.checkpointer.adelete_thread(evicted)
+
+
+async def has_history(thread_id: str) -> bool:
+    """Tell whether the thread already holds earlier turns of a conversation."""
+    agent = build_orchestrator()
+    if agent.checkpointer is None:
+        return False
+    state = await agent.aget_state(thread_config(thread_id))
+    return bool(state.values.get("messages"))
+
+
+async def remember_turn(thread_id: str, query: str, answer: str) -> None:
+    """Append a turn answered outside the graph (cache hit, direct route) to the thread."""
+    agent = build_orchestrator()
+    if agent.checkpointer is None:
+        return
+    await agent.aupdate_state(
+        thread_config(thread_id),
+        {"messages": [HumanMessage(content=query), AIMessage(content=answer)]},
+        as_node="orchestrator",
+    )
+    await keep_thread(thread_id)
+
+
+async def forget_thread(thread_id: str) -> None:
+    """Drop the stored state of a thread."""
+    _THREADS.pop(thread_id, None)
+    agent = build_orchestrator()
+    if agent.checkpointer is not None:
+        await agent.checkpointer.adelete_thread(thread_id)
@@ -1,32 +1,70 @@
 """A2A AgentExecutor for the Orchestrator."""
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
-from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.agent_execution import (
+    AgentExecutor,
+    RequestContext,
+    SimpleRequestContextBuilder,
+)
+from a2a.server.context import ServerCallContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (
     InvalidParamsError,
+    MessageSendParams,
     Part,
+    Task,
     TaskState,
     TextPart,
     UnsupportedOperationError,
 )
 from a2a.utils import new_task
 from a2a.utils.errors import ServerError
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessageChunk, HumanMessage
 from typing_extensions import override
 
-from agents.orchestrator.agent import build_orchestrator
+from agents.orchestrator.agent import (
+    answer_directly,
+    build_orchestrator,
+    forget_thread,
+    get_cached_response,
+    has_history,
+    keep_thread,
+    remember_turn,
+    reply_text,
+    store_response,
+    thread_config,
+)
 from utils.logging import get_logger
+from utils.streaming import TokenBatcher
 
 logger = get_logger(__name__)
 
 
+# ServerCallContext.state key set when the server minted the context id.
+_ONE_OFF_CONTEXT = "orchestrator_one_off_context"
+
+
+class OrchestratorContextBuilder(SimpleRequestContextBuilder):
+    """Request context builder that notes whether the caller sent a context id.
+
+    The SDK fills in a fresh context id before the executor runs, so without
+    this note a one-off message looks like the start of a conversation.
+    """
+
+    async def build(
+        self,
+        params: MessageSendParams | None = None,
+        task_id: str | None = None,
+        context_id: str | None = None,
+        task: Task | None = None,
+        context: ServerCallContext | None = None,
+    ) -> RequestContext:
+        if params is not None and context is not None and not context_id and task is None:
+            context.state[_ONE_OFF_CONTEXT] = True
+        return await super().build(params, task_id, context_id, task, context)
+
+
 class OrchestratorExecutor(AgentExecutor):
     """Wraps the LangGraph Orchestrator as an A2A-compliant executor."""
 
@@ -41,6 +79,8 @@ class OrchestratorExecutor(AgentExecutor):
 
         query = context.get_user_input()
         logger.info("orchestrator_execute", query=query[:100])
+        # Without a caller-supplied context id nobody can continue the thread.
+        one_off = bool(context.call_context and context.call_context.state.get(_ONE_OFF_CONTEXT))
 
         task = context.current_task
         if not task:
@@ -59,27 +99,44 @@ class OrchestratorExecutor(AgentExecutor):
                 ),
             )
 
-            messages = [HumanMessage(content=query)]
-            final_response = ""
-
-            async for chunk in self.agent.astream(
-                {"messages": messages, "session_id": task.context_id, "delegated_to": None},
-                stream_mode="values",
-            ):
-                msgs = chunk.get("messages", [])
-                if msgs:
-                    last_msg = msgs[-1]
-                    if isinstance(last_msg, AIMessage) and last_msg.content:
-                        content = last_msg.content
-                        if isinstance(content, list):
-                            text_parts = [
-                                c["text"]
-                                for c in content
-                                if isinstance(c, dict) and c.get("type") == "text"
-                            ]
-                            final_response = " ".join(text_parts)
-                        elif isinstance(content, str):
-                            final_response = content
+            # Cached answers and direct routes only see this one message, so
+            # follow-ups in an ongoing conversation always go through the graph.
+            first_turn = not await has_history(task.context_id)
+            final_response = (await get_cached_response(query) if first_turn else None) or ""
+            if final_response:
+                logger.info("orchestrator_cache_hit", task_id=task.id)
+                await remember_turn(task.context_id, query, final_response)
+            elif first_turn and (direct := await answer_directly(query)) is not None:
+                final_response = direct
+                await remember_turn(task.context_id, query, final_response)
+            else:
+                messages = [HumanMessage(content=query)]
+                final_messages: list = []
+                tokens = TokenBatcher(updater)
+
+                async for mode, chunk in self.agent.astream(
+                    {"messages": messages, "session_id": task.context_id, "delegated_to": None},
+                    config=thread_config(task.context_id),
+                    stream_mode=["messages", "values"],
+                ):
+                    if mode == "messages":
+                        # Forward orchestrator tokens as they are generated, in small batches.
+                        msg_chunk, metadata = chunk
+                        if (
+                            metadata.get("langgraph_node") == "orchestrator"
+                            and isinstance(msg_chunk, AIMessageChunk)
+                            and isinstance(msg_chunk.content, str)
+                            and msg_chunk.content
+                        ):
+                            await tokens.add(msg_chunk.content)
+                        continue
+
+                    final_messages = chunk.get("messages", final_messages)
+
+                final_response = reply_text(final_messages)
+                await tokens.flush()
+                await keep_thread(task.context_id)
+                await store_response(query, final_response, final_messages)
 
             if not final_response:
                 final_response = "Üzgünüm, isteğinizi işleyemedim. Lütfen tekrar deneyin."
@@ -99,6 +156,9 @@ class OrchestratorExecutor(AgentExecutor):
                     parts=[TextPart(text=f"Sistem hatası: {str(e)}. Lütfen tekrar deneyin.")]
                 )
             )
+        finally:
+            if one_off:
+                await forget_thread(task.context_id)
 
     @override
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
@@ -8,26 +8,45 @@ Exposes:
 """
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import asyncio
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from functools import partial
 
 import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from langchain_core.messages import HumanMessage
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 from starlette.routing import Mount, Route
 
-from agents.orchestrator.executor import OrchestratorExecutor
+from agents.orchestrator.agent import (
+    answer_directly,
+    build_orchestrator,
+    close_http_client,
+    forget_thread,
+    get_cached_response,
+    has_history,
+    keep_thread,
+    mentions_orders,
+    remember_turn,
+    reply_text,
+    store_response,
+    thread_config,
+)
+from agents.orchestrator.executor import OrchestratorContextBuilder, OrchestratorExecutor
+from utils.agent_card import agent_card_routes
+from utils.aggregator import Coalescer
 from utils.config import get_settings
 from utils.logging import configure_logging, get_logger
+from utils.serialization import ORJSONResponse, dumps_bytes
+from utils.task_store import build_task_store
 
 settings = get_settings()
 configure_logging(settings.log_level, "orchestrator")
@@ -45,7 +64,7 @@ def get_agent_card(host: str, port: int) -> AgentCard:
         version="1.0.0",
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
-        capabilities=AgentCapabilities(streaming=False),
+        capabilities=AgentCapabilities(streaming=True),
         skills=[
             AgentSkill(
                 id="shopping_assistant",
@@ -63,23 +82,157 @@ def get_agent_card(host: str, port: int) -> AgentCard:
     )
 
 
-async def health_endpoint(request: Request) -> JSONResponse:
-    """Health check endpoint for container orchestration."""
-    return JSONResponse(
-        {
-            "status": "healthy",
-            "service": "ecommerce-orchestrator",
-            "version": "1.0.0",
-            "agents": {
-                "product_agent": settings.product_agent_url,
-                "order_agent": settings.order_agent_url,
-                "search_agent": settings.search_agent_url,
+# Static per process, so built and encoded once instead of on every request.
+_AGENT_CARD = get_agent_card("0.0.0.0", settings.orchestrator_port)
+_HEALTH_BODY = dumps_bytes(
+    {
+        "status": "healthy",
+        "service": "ecommerce-orchestrator",
+        "version": "1.0.0",
+        "agents": {
+            "product_agent": settings.product_agent_url,
+            "order_agent": settings.order_agent_url,
+            "search_agent": settings.search_agent_url,
+        },
+    }
+)
+_AGENTS_BODY = dumps_bytes(
+    {
+        "agents": [
+            {
+                "name": "Product Agent",
+                "url": settings.product_agent_url,
+                "agent_card": f"{settings.product_agent_url}.well-known/agent.json",
+                "port": settings.product_agent_port,
             },
-        }
-    )
+            {
+                "name": "Order Agent",
+                "url": settings.order_agent_url,
+                "agent_card": f"{settings.order_agent_url}.well-known/agent.json",
+                "port": settings.order_agent_port,
+            },
+            {
+                "name": "Search Agent",
+                "url": settings.search_agent_url,
+                "agent_card": f"{settings.search_agent_url}.well-known/agent.json",
+                "port": settings.search_agent_port,
+            },
+        ]
+    }
+)
+
+
+async def health_endpoint(request: Request) -> Response:
+    """Health check endpoint for container orchestration."""
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
-async def chat_endpoint(request: Request) -> JSONResponse:
+async def _run_orchestrator(message: str, session_id: str) -> str:
+    """Run one turn of the session's conversation and return the answer.
+
+    Direct routes only see ``message``, so they answer first turns only.
+    """
+    if not await has_history(session_id):
+        direct = await answer_directly(message)
+        if direct is not None:
+            await remember_turn(session_id, message, direct)
+            return direct
+
+    agent = build_orchestrator()
+    final_messages: list = []
+    async for chunk in agent.astream(
+        {"messages": [HumanMessage(content=message)], "session_id": session_id, "delegated_to": None},
+        config=thread_config(session_id),
+        stream_mode="values",
+    ):
+        final_messages = chunk.get("messages", final_messages)
+
+    final_response = reply_text(final_messages)
+    await keep_thread(session_id)
+    await store_response(message, final_response, final_messages)
+    return final_response
+
+
+class MessageCoalescer:
+    """
+    Serialize each session's runs and merge follow-ups that queue up meanwhile.
+
+    A message for an idle session runs at once. Messages that arrive while a
+    run for the same session is in flight wait for it, then are answered by a
+    single combined run; every caller in that batch gets the same answer.
+    Batches larger than ``max_chars`` are processed one message at a time.
+    Only one run per session is ever active, so checkpointed history stays in
+    order.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, str], Awaitable[str]],
+        max_chars: int = 4096,
+    ) -> None:
+        self._run = run
+        self._max_chars = max_chars
+        self._pending: dict[str, list[tuple[str, asyncio.Future[str]]]] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+
+    async def submit(self, session_id: str, message: str) -> str:
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(session_id, []).append((message, future))
+        if session_id not in self._tasks:
+            self._tasks[session_id] = asyncio.create_task(self._drain(session_id))
+        return await future
+
+    async def _drain(self, session_id: str) -> None:
+        try:
+            # Nothing awaits between the empty check and the task removal, so
+            # a new submit either lands in this loop or starts a fresh drain.
+            while batch := self._pending.pop(session_id, None):
+                await self._process(session_id, batch)
+        finally:
+            del self._tasks[session_id]
+
+    async def _process(
+        self, session_id: str, batch: list[tuple[str, asyncio.Future[str]]]
+    ) -> None:
+        try:
+            if len(batch) > 1 and sum(len(m) for m, _ in batch) <= self._max_chars:
+                logger.info("chat_messages_coalesced", session_id=session_id, count=len(batch))
+                combined = "\n".join(
+                    f"--- Mesaj {i} ---\n{m}" for i, (m, _) in enumerate(batch, start=1)
+                )
+                response = await self._run(combined, session_id)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(response)
+            else:
+                for message, future in batch:
+                    response = await self._run(message, session_id)
+                    if not future.done():
+                        future.set_result(response)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+_coalescer = MessageCoalescer(_run_orchestrator)
+
+
+async def _run_stateless(message: str) -> str:
+    """Answer a message on a throwaway thread that is dropped afterwards."""
+    thread_id = uuid.uuid4().hex
+    try:
+        return await _run_orchestrator(message, thread_id)
+    finally:
+        await forget_thread(thread_id)
+
+
+# Identical messages without a session share a run that is still in flight.
+# Order queries can cancel orders, so they never share (see chat_endpoint).
+_stateless_runs: Coalescer[str] = Coalescer(window=0)
+
+
+async def chat_endpoint(request: Request) -> ORJSONResponse:
     """
     Simple REST endpoint for direct chat.
 
@@ -90,38 +243,34 @@ async def chat_endpoint(request: Request) -> JSONResponse:
         body = await request.json()
         message = body.get("message", "").strip()
         if not message:
-            return JSONResponse({"error": "message field is required"}, status_code=400)
+            return ORJSONResponse({"error": "message field is required"}, status_code=400)
 
         session_id = body.get("session_id", "default")
+        # "default" is shared by unrelated clients, so only explicit sessions
+        # keep conversation state; others get a one-off thread.
+        stateful = "session_id" in body
 
-        # Use the orchestrator agent directly
-        from agents.orchestrator.agent import build_orchestrator
-        from langchain_core.messages import HumanMessage
-
-        agent = build_orchestrator()
-        final_response = ""
-
-        async for chunk in agent.astream(
-            {"messages": [HumanMessage(content=message)], "session_id": session_id, "delegated_to": None},
-            stream_mode="values",
-        ):
-            from langchain_core.messages import AIMessage as LCAIMessage
-            msgs = chunk.get("messages", [])
-            if msgs:
-                last_msg = msgs[-1]
-                if isinstance(last_msg, LCAIMessage) and last_msg.content:
-                    content = last_msg.content
-                    if isinstance(content, list):
-                        text_parts = [
-                            c["text"]
-                            for c in content
-                            if isinstance(c, dict) and c.get("type") == "text"
-                        ]
-                        final_response = " ".join(text_parts)
-                    elif isinstance(content, str):
-                        final_response = content
-
-        return JSONResponse(
+        # A cached single-turn answer would ignore an ongoing conversation.
+        if not stateful or not await has_history(session_id):
+            cached = await get_cached_response(message)
+            if cached:
+                logger.info("chat_cache_hit", session_id=session_id)
+                if stateful:
+                    await remember_turn(session_id, message, cached)
+                return ORJSONResponse({"response": cached, "session_id": session_id})
+
+        if not stateful and mentions_orders(message):
+            final_response = await _run_stateless(message)
+        elif not stateful:
+            final_response = await _stateless_runs.run(
+                message, partial(_run_stateless, message)
+            )
+        elif settings.allow_message_coalescing:
+            final_response = await _coalescer.submit(session_id, message)
+        else:
+            final_response = await _run_orchestrator(message, session_id)
+
+        return ORJSONResponse(
             {
                 "response": final_response or "Yanıt oluşturulamadı.",
                 "session_id": session_id,
@@ -129,48 +278,31 @@ async def chat_endpoint(request: Request) -> JSONResponse:
         )
     except Exception as e:
         logger.error("chat_endpoint_error", error=str(e))
-        return JSONResponse({"error": str(e)}, status_code=500)
+        return ORJSONResponse({"error": str(e)}, status_code=500)
 
 
-async def list_agents_endpoint(request: Request) -> JSONResponse:
+async def list_agents_endpoint(request: Request) -> Response:
     """List all available agents and their capabilities."""
-    return JSONResponse(
-        {
-            "agents": [
-                {
-                    "name": "Product Agent",
-                    "url": settings.product_agent_url,
-                    "agent_card": f"{settings.product_agent_url}.well-known/agent.json",
-                    "port": settings.product_agent_port,
-                },
-                {
-                    "name": "Order Agent",
-                    "url": settings.order_agent_url,
-                    "agent_card": f"{settings.order_agent_url}.well-known/agent.json",
-                    "port": settings.order_agent_port,
-                },
-                {
-                    "name": "Search Agent",
-                    "url": settings.search_agent_url,
-                    "agent_card": f"{settings.search_agent_url}.well-known/agent.json",
-                    "port": settings.search_agent_port,
-                },
-            ]
-        }
-    )
+    return Response(_AGENTS_BODY, media_type="application/json")
 
 
-def build_app() -> Starlette:
-    host = "0.0.0.0"
-    port = settings.orchestrator_port
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Release pooled outbound connections when the server shuts down."""
+    yield
+    await close_http_client()
+
 
+def build_app() -> Starlette:
     # Build A2A app
+    task_store = build_task_store()
     request_handler = DefaultRequestHandler(
         agent_executor=OrchestratorExecutor(),
-        task_store=InMemoryTaskStore(),
+        task_store=task_store,
+        request_context_builder=OrchestratorContextBuilder(task_store=task_store),
     )
     a2a_server = A2AStarletteApplication(
-        agent_card=get_agent_card(host, port),
+        agent_card=_AGENT_CARD,
         http_handler=request_handler,
     )
     a2a_app = a2a_server.build()
@@ -182,6 +314,7 @@ def build_app() -> Starlette:
             Route("/health", endpoint=health_endpoint, methods=["GET"]),
             Route("/api/chat", endpoint=chat_endpoint, methods=["POST"]),
             Route("/api/agents", endpoint=list_agents_endpoint, methods=["GET"]),
+            *agent_card_routes(_AGENT_CARD),
             Mount("/", app=a2a_app),
         ],
         middleware=[
@@ -192,6 +325,7 @@ def build_app() -> Starlette:
                 allow_headers=["*"],
             )
         ],
+        lifespan=lifespan,
     )
     return app
 
@@ -200,7 +334,14 @@ def main() -> None:
     host = "0.0.0.0"
     port = settings.orchestrator_port
     logger.info("orchestrator_server_starting", host=host, port=port)
-    uvicorn.run(build_app(), host=host, port=port, log_level=settings.log_level.lower())
+    uvicorn.run(
+        build_app(),
+        host=host,
+        port=port,
+        log_level=settings.log_level.lower(),
+        loop="uvloop",
+        http="httptools",
+    )
 
 
 if __name__ == "__main__":
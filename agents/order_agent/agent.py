@@ -4,22 +4,24 @@ status management, and customer support.
 """
 from __future__ import annotations
 
-import json
-import sys
-from pathlib import Path
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from typing import Annotated, Any, TypedDict
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
+import httpx
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import tool
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
+from utils.cache import TTLCache
 from utils.config import get_settings
 from utils.logging import get_logger
+from utils.models import OrderStatus
+from utils.serialization import dumps
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -30,21 +32,60 @@ class OrderAgentState(TypedDict):
     session_id: str
 
 
+_MCP_TOOL_URL = f"{settings.mcp_server_url}/tool"
+_HTTPX_CLIENT: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled httpx client shared by all MCP tool calls."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is None or _HTTPX_CLIENT.is_closed:
+        _HTTPX_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(15.0, connect=5.0),
+        )
+    return _HTTPX_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client (called on server shutdown)."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is not None:
+        await _HTTPX_CLIENT.aclose()
+        _HTTPX_CLIENT = None
+
+
 async def _call_mcp_tool(tool_name: str, arguments: dict[str, Any]) -> str:
     """Call MCP tool with fallback to direct data access."""
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(
-                f"{settings.mcp_server_url}/tool",
-                json={"name": tool_name, "arguments": arguments},
-            )
-            resp.raise_for_status()
-            return resp.text
+        resp = await _get_client().post(
+            _MCP_TOOL_URL,
+            json={"name": tool_name, "arguments": arguments},
+        )
+        resp.raise_for_status()
+        return resp.text
     except Exception:
         return await _direct_tool_call(tool_name, arguments)
 
 
+# Mirrors the MCP server caps so the fallback path returns the same shape.
+DEFAULT_ORDER_LIMIT = 20
+MAX_TRACKING_EVENTS = 10
+
+
+@dataclass(slots=True)
+class _OrderSummary:
+    """Row of the ``get_customer_orders`` response; orjson serializes it natively."""
+
+    id: str
+    status: OrderStatus
+    total: float
+    item_count: int
+    created_at: datetime
+    tracking_number: str | None
+    estimated_delivery: str | None
+
+
 async def _direct_tool_call(tool_name: str, arguments: dict[str, Any]) -> str:
     from data.mock_data import (
         get_order_by_id,
@@ -52,13 +93,12 @@ async def _direct_tool_call(tool_name: str, arguments: dict[str, Any]) -> str:
         get_orders_by_customer,
         get_customer_by_email,
     )
-    from utils.models import OrderStatus
 
     if tool_name == "get_order_status":
         order = get_order_by_id(arguments["order_id"])
         if not order:
-            return json.dumps({"error": f"Sipariş {arguments['order_id']} bulunamadı"})
-        return json.dumps({
+            return dumps({"error": f"Sipariş {arguments['order_id']} bulunamadı"})
+        return dumps({
             "order_id": order.id,
             "status": order.status.value,
             "tracking_number": order.tracking_number,
@@ -72,9 +112,9 @@ async def _direct_tool_call(tool_name: str, arguments: dict[str, Any]) -> str:
                     "location": e.location,
                     "description": e.description,
                 }
-                for e in order.tracking_events
+                for e in order.tracking_events[-MAX_TRACKING_EVENTS:]
             ],
-        }, ensure_ascii=False, default=str)
+        })
 
     elif tool_name == "get_customer_orders":
         if arguments.get("email"):
@@ -82,33 +122,36 @@ async def _direct_tool_call(tool_name: str, arguments: dict[str, Any]) -> str:
         elif arguments.get("customer_id"):
             orders = get_orders_by_customer(arguments["customer_id"])
         else:
-            return json.dumps({"error": "Email veya müşteri ID gerekli"})
-        return json.dumps({
+            return dumps({"error": "Email veya müşteri ID gerekli"})
+        limit = arguments.get("limit", DEFAULT_ORDER_LIMIT)
+        recent = sorted(orders, key=lambda o: o.created_at, reverse=True)[:limit]
+        return dumps({
             "orders": [
-                {
-                    "id": o.id,
-                    "status": o.status.value,
-                    "total": o.total,
-                    "item_count": len(o.items),
-                    "created_at": o.created_at.isoformat(),
-                    "tracking_number": o.tracking_number,
-                    "estimated_delivery": o.estimated_delivery,
-                }
-                for o in orders
+                _OrderSummary(
+                    o.id,
+                    o.status,
+                    o.total,
+                    len(o.items),
+                    o.created_at,
+                    o.tracking_number,
+                    o.estimated_delivery,
+                )
+                for o in recent
             ],
             "total": len(orders),
-        }, ensure_ascii=False, default=str)
+            "has_more": len(orders) > limit,
+        })
 
     elif tool_name == "cancel_order":
         order = get_order_by_id(arguments["order_id"])
         if not order:
-            return json.dumps({"error": "Sipariş bulunamadı"})
+            return dumps({"error": "Sipariş bulunamadı"})
         if order.status not in (OrderStatus.PENDING, OrderStatus.CONFIRMED):
-            return json.dumps({
+            return dumps({
                 "error": f"Sipariş iptal edilemiyor. Mevcut durum: {order.status.value}",
                 "cancellable": False,
             })
-        return json.dumps({
+        return dumps({
             "success": True,
             "order_id": order.id,
             "message": f"Sipariş {order.id} başarıyla iptal edildi. İade 3-5 iş gününde işleme alınacak.",
@@ -118,10 +161,10 @@ async def _direct_tool_call(tool_name: str, arguments: dict[str, Any]) -> str:
     elif tool_name == "get_customer_profile":
         customer = get_customer_by_email(arguments.get("email", ""))
         if not customer:
-            return json.dumps({"error": "Müşteri bulunamadı"})
-        return json.dumps(customer.model_dump(), ensure_ascii=False, default=str)
+            return dumps({"error": "Müşteri bulunamadı"})
+        return customer.model_dump_json()
 
-    return json.dumps({"error": f"Tool not available: {tool_name}"})
+    return dumps({"error": f"Tool not available: {tool_name}"})
 
 
 @tool
@@ -131,9 +174,11 @@ async def get_order_status(order_id: str) -> str:
 
 
 @tool
-async def get_customer_orders(email: str | None = None, customer_id: str | None = None) -> str:
-    """Bir müşterinin tüm siparişlerini email veya müşteri ID ile getir."""
-    args: dict[str, Any] = {}
+async def get_customer_orders(
+    email: str | None = None, customer_id: str | None = None, limit: int = DEFAULT_ORDER_LIMIT
+) -> str:
+    """Bir müşterinin en yeni siparişlerini email veya müşteri ID ile getir (has_more ise limit artırılabilir)."""
+    args: dict[str, Any] = {"limit": limit}
     if email:
         args["email"] = email
     if customer_id:
@@ -159,27 +204,47 @@ async def search_customers(query: str) -> str:
     return await _call_mcp_tool("search_customers", {"query": query})
 
 
+_TAVILY: Any = None
+# Shipping questions repeat a lot ("Yurtiçi Kargo teslim süresi"), so results
+# are kept for a while keyed by the normalized query.
+_SHIPPING_SEARCH_CACHE: TTLCache[str, str] = TTLCache(maxsize=512, ttl=600)
+
+
+def _get_tavily() -> Any:
+    """Return the shared async Tavily client, creating it on first use."""
+    global _TAVILY
+    if _TAVILY is None:
+        from tavily import AsyncTavilyClient  # type: ignore
+        _TAVILY = AsyncTavilyClient(api_key=settings.tavily_api_key)
+    return _TAVILY
+
+
 @tool
 async def web_search_shipping(query: str) -> str:
     """Kargo firmaları, teslimat süreleri veya iade politikaları hakkında web'de ara."""
     if not settings.tavily_api_key:
-        return json.dumps({"message": "Web araması yapılandırılmamış (TAVILY_API_KEY eksik)", "results": []})
+        return dumps({"message": "Web araması yapılandırılmamış (TAVILY_API_KEY eksik)", "results": []})
+    key = " ".join(query.casefold().split())
+    cached = _SHIPPING_SEARCH_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
-        from tavily import TavilyClient  # type: ignore
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        results = client.search(query=query, search_depth="basic", max_results=3, include_answer=True)
-        return json.dumps(
-            {
-                "answer": results.get("answer", ""),
-                "results": [
-                    {"title": r["title"], "url": r["url"], "content": r["content"][:400]}
-                    for r in results.get("results", [])[:3]
-                ],
-            },
-            ensure_ascii=False,
+        results = await _get_tavily().search(
+            query=query, search_depth="basic", max_results=3, include_answer=True
         )
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
+    payload = dumps(
+        {
+            "answer": results.get("answer", ""),
+            "results": [
+                {"title": r["title"], "url": r["url"], "content": r["content"][:400]}
+                for r in results.get("results", [])[:3]
+            ],
+        }
+    )
+    _SHIPPING_SEARCH_CACHE.set(key, payload)
+    return payload
 
 
 SYSTEM_PROMPT = """Sen bir e-ticaret sipariş yönetimi uzmanı AI asistanısın. 
@@ -200,9 +265,17 @@ Kurallar:
 - Müşteriye empati göster, sorunlarını çözmeye odaklan
 - Tarih ve saatleri Türkiye saat dilimine göre göster"""
 
+# Built once and kept byte-identical across calls so the provider's automatic
+# prompt-prefix caching can reuse it.
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
+
 
+@lru_cache(maxsize=1)
 def build_order_agent() -> Any:
-    """Build and return the compiled LangGraph order agent."""
+    """Build and return the compiled LangGraph order agent.
+
+    The graph is built once per process and shared by every caller.
+    """
     tools = [
         get_order_status,
         get_customer_orders,
@@ -228,8 +301,7 @@ def build_order_agent() -> Any:
         return END
 
     async def call_model(state: OrderAgentState) -> dict[str, Any]:
-        from langchain_core.messages import SystemMessage
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + state["messages"]
+        messages = [_SYSTEM_MSG] + state["messages"]
         response = await llm.ainvoke(messages)
         return {"messages": [response]}
 
@@ -1,11 +1,6 @@
 """A2A AgentExecutor wrapping the LangGraph Order Agent."""
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
@@ -18,12 +13,15 @@ from a2a.types import (
 )
 from a2a.utils import new_task
 from a2a.utils.errors import ServerError
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
 from typing_extensions import override
 
 from agents.order_agent.agent import build_order_agent
+from utils.config import get_settings
 from utils.logging import get_logger
+from utils.streaming import TokenBatcher
 
+settings = get_settings()
 logger = get_logger(__name__)
 
 
@@ -40,6 +38,15 @@ class OrderAgentExecutor(AgentExecutor):
             raise ServerError(error=InvalidParamsError())
 
         query = context.get_user_input()
+        # Reject unusable input before spending a task, an LLM call or tool calls on it.
+        if not query.strip():
+            raise ServerError(error=InvalidParamsError(message="Boş mesaj gönderilemez."))
+        if len(query) > settings.max_query_chars:
+            raise ServerError(
+                error=InvalidParamsError(
+                    message=f"Mesaj çok uzun (en fazla {settings.max_query_chars} karakter)."
+                )
+            )
         logger.info("order_agent_execute", query=query[:100])
 
         task = context.current_task
@@ -60,29 +67,42 @@ class OrderAgentExecutor(AgentExecutor):
             )
 
             messages = [HumanMessage(content=query)]
-            final_response = ""
-
-            async for chunk in self.agent.astream(
+            state: dict = {}
+            tokens = TokenBatcher(updater)
+            async for mode, chunk in self.agent.astream(
                 {"messages": messages, "session_id": task.context_id},
-                stream_mode="values",
+                stream_mode=["messages", "values"],
             ):
-                msgs = chunk.get("messages", [])
-                if msgs:
-                    last_msg = msgs[-1]
-                    if isinstance(last_msg, AIMessage) and last_msg.content:
-                        content = last_msg.content
-                        if isinstance(content, list):
-                            text_parts = [
-                                c["text"]
-                                for c in content
-                                if isinstance(c, dict) and c.get("type") == "text"
-                            ]
-                            final_response = " ".join(text_parts)
-                        elif isinstance(content, str):
-                            final_response = content
-
-            if not final_response:
-                final_response = "Üzgünüm, bu konuda size yardımcı olamadım."
+                if mode == "values":
+                    state = chunk
+                    continue
+                # Forward model tokens as they are generated, in small batches.
+                msg_chunk, metadata = chunk
+                if (
+                    metadata.get("langgraph_node") == "agent"
+                    and isinstance(msg_chunk, AIMessageChunk)
+                    and isinstance(msg_chunk.content, str)
+                    and msg_chunk.content
+                ):
+                    await tokens.add(msg_chunk.content)
+            await tokens.flush()
+
+            last_msg = next(
+                (
+                    m
+                    for m in reversed(state.get("messages", []))
+                    if isinstance(m, AIMessage) and m.content
+                ),
+                None,
+            )
+            content = last_msg.content if last_msg is not None else ""
+            final_response = (
+                " ".join(
+                    c["text"] for c in content if isinstance(c, dict) and c.get("type") == "text"
+                )
+                if isinstance(content, list)
+                else content
+            ) or "Üzgünüm, bu konuda size yardımcı olamadım."
 
             await updater.add_artifact(
                 parts=[Part(root=TextPart(text=final_response))],
@@ -1,20 +1,21 @@
 """A2A HTTP Server for the Order Agent."""
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from starlette.applications import Starlette
 
+from agents.order_agent.agent import close_http_client
 from agents.order_agent.executor import OrderAgentExecutor
+from utils.agent_card import agent_card_routes
 from utils.config import get_settings
 from utils.logging import configure_logging, get_logger
+from utils.task_store import build_task_store
 
 settings = get_settings()
 configure_logging(settings.log_level, "order-agent")
@@ -32,7 +33,7 @@ def get_agent_card(host: str, port: int) -> AgentCard:
         version="1.0.0",
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
-        capabilities=AgentCapabilities(streaming=False),
+        capabilities=AgentCapabilities(streaming=True),
         skills=[
             AgentSkill(
                 id="order_tracking",
@@ -66,22 +67,41 @@ def get_agent_card(host: str, port: int) -> AgentCard:
     )
 
 
-def main() -> None:
-    host = "0.0.0.0"
-    port = settings.order_agent_port
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Release pooled MCP connections when the server shuts down."""
+    yield
+    await close_http_client()
+
 
+def build_app() -> Starlette:
+    """Build the A2A Starlette app (also the gunicorn app factory, see gunicorn_conf.py)."""
     request_handler = DefaultRequestHandler(
         agent_executor=OrderAgentExecutor(),
-        task_store=InMemoryTaskStore(),
+        task_store=build_task_store(),
     )
 
+    agent_card = get_agent_card("0.0.0.0", settings.order_agent_port)
     server = A2AStarletteApplication(
-        agent_card=get_agent_card(host, port),
+        agent_card=agent_card,
         http_handler=request_handler,
     )
+    return server.build(routes=agent_card_routes(agent_card), lifespan=lifespan)
+
+
+def main() -> None:
+    host = "0.0.0.0"
+    port = settings.order_agent_port
 
     logger.info("order_agent_server_starting", host=host, port=port)
-    uvicorn.run(server.build(), host=host, port=port, log_level=settings.log_level.lower())
+    uvicorn.run(
+        build_app(),
+        host=host,
+        port=port,
+        log_level=settings.log_level.lower(),
+        loop="uvloop",
+        http="httptools",
+    )
 
 
 if __name__ == "__main__":
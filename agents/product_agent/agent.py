@@ -4,23 +4,36 @@ recommendations, and price analysis using MCP tools + Tavily web search.
 """
 from __future__ import annotations
 
-import json
-import sys
-from pathlib import Path
+import re
+import uuid
+from collections.abc import Callable
+from functools import lru_cache
 from typing import Annotated, Any, TypedDict
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 import httpx
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+import orjson
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain_core.tools import tool
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
+from data.mock_data import PRODUCT_SUMMARIES, get_product_by_id, get_top_rated_products
+from data.mock_data import search_products as _search_products
+from utils.aggregator import Coalescer
+from utils.cache import SemanticCache, TTLCache
 from utils.config import get_settings
+from utils.llm_cache import LLMCache
 from utils.logging import get_logger
+from utils.semantic_router import EmbeddingRouter
+from utils.serialization import dumps
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -39,16 +52,49 @@ class ProductAgentState(TypedDict):
 # MCP Tool wrappers  (call MCP server via HTTP)
 # ─────────────────────────────────────────────────────────────────────────────
 
+_MCP_TOOL_URL = f"{settings.mcp_server_url}/tool"
+_HTTPX_CLIENT: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled httpx client shared by all MCP tool calls."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is None or _HTTPX_CLIENT.is_closed:
+        _HTTPX_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(15.0, connect=5.0),
+        )
+    return _HTTPX_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client (called on server shutdown)."""
+    global _HTTPX_CLIENT
+    if _HTTPX_CLIENT is not None:
+        await _HTTPX_CLIENT.aclose()
+        _HTTPX_CLIENT = None
+
+
+# Product tools are read-only, so identical calls from concurrent sessions
+# (same hot search or category) share one MCP round-trip.
+_MCP_COALESCER: Coalescer[str] = Coalescer(window=0.005)
+
+
 async def _call_mcp_tool(tool_name: str, arguments: dict[str, Any]) -> str:
+    """Call a tool on the MCP server, sharing the result with identical in-flight calls."""
+    key = (tool_name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS))
+    return await _MCP_COALESCER.run(key, lambda: _post_mcp_tool(tool_name, arguments))
+
+
+async def _post_mcp_tool(tool_name: str, arguments: dict[str, Any]) -> str:
     """Call a tool on the MCP server via HTTP."""
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(
-                f"{settings.mcp_server_url}/tool",
-                json={"name": tool_name, "arguments": arguments},
-            )
-            resp.raise_for_status()
-            return resp.text
+        resp = await _get_client().post(
+            _MCP_TOOL_URL,
+            json={"name": tool_name, "arguments": arguments},
+        )
+        resp.raise_for_status()
+        return resp.text
     except Exception as e:
         logger.warning("mcp_tool_fallback", tool=tool_name, error=str(e))
         # Fallback: call data layer directly
@@ -57,45 +103,34 @@ async def _call_mcp_tool(tool_name: str, arguments: dict[str, Any]) -> str:
 
 async def _direct_tool_call(tool_name: str, arguments: dict[str, Any]) -> str:
     """Direct fallback when MCP server is unavailable."""
-    from data.mock_data import (
-        get_product_by_id,
-        get_products_by_category,
-        search_products,
-        PRODUCTS,
-    )
-    from utils.models import ProductCategory
-
     if tool_name == "search_products":
-        results = search_products(arguments.get("query", ""))
-        if arguments.get("category"):
-            results = [p for p in results if p.category.value == arguments["category"]]
-        if arguments.get("max_price"):
-            results = [p for p in results if p.price <= arguments["max_price"]]
-        if arguments.get("in_stock_only"):
-            results = [p for p in results if p.in_stock]
-        return json.dumps({
-            "products": [
-                {"id": p.id, "name": p.name, "price": p.price, "rating": p.rating,
-                 "in_stock": p.in_stock, "brand": p.brand, "category": p.category.value}
-                for p in results
-            ],
-            "total": len(results),
-        }, ensure_ascii=False)
+        matches = _search_products(arguments.get("query", ""))
+        category = arguments.get("category")
+        max_price = arguments.get("max_price")
+        in_stock_only = arguments.get("in_stock_only")
+        results = [
+            summary
+            for summary in (PRODUCT_SUMMARIES[p.id] for p in matches)
+            if (not category or summary["category"] == category)
+            and (not max_price or summary["price"] <= max_price)
+            and (not in_stock_only or summary["in_stock"])
+        ]
+        return dumps({"products": results, "total": len(results)})
 
     elif tool_name == "get_product_details":
         p = get_product_by_id(arguments["product_id"])
-        return json.dumps(p.model_dump() if p else {"error": "not found"}, ensure_ascii=False, default=str)
+        return p.model_dump_json() if p else dumps({"error": "not found"})
 
     elif tool_name == "get_recommendations":
-        top = sorted(PRODUCTS, key=lambda x: x.rating, reverse=True)[:4]
-        return json.dumps({
+        top = get_top_rated_products(arguments.get("limit", 4))
+        return dumps({
             "recommendations": [
                 {"id": p.id, "name": p.name, "price": p.price, "rating": p.rating}
                 for p in top
             ]
-        }, ensure_ascii=False)
+        })
 
-    return json.dumps({"error": f"Tool {tool_name} not available in fallback"})
+    return dumps({"error": f"Tool {tool_name} not available in fallback"})
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -156,33 +191,117 @@ async def search_customers(query: str) -> str:
     return await _call_mcp_tool("search_customers", {"query": query})
 
 
+_TAVILY: Any = None
+# Repeated review/price questions within a session reuse the earlier results.
+_WEB_SEARCH_CACHE: TTLCache[str, str] = TTLCache(maxsize=512, ttl=900)
+
+
+def _get_tavily() -> Any:
+    """Return the shared async Tavily client, creating it on first use."""
+    global _TAVILY
+    if _TAVILY is None:
+        from tavily import AsyncTavilyClient  # type: ignore
+        _TAVILY = AsyncTavilyClient(api_key=settings.tavily_api_key)
+    return _TAVILY
+
+
 @tool
 async def web_search_products(query: str) -> str:
     """Search the web for product reviews, comparisons, or current market prices using Tavily."""
     if not settings.tavily_api_key:
-        return json.dumps({"message": "Web search not configured (no TAVILY_API_KEY)", "results": []})
+        return dumps({"message": "Web search not configured (no TAVILY_API_KEY)", "results": []})
+    key = " ".join(query.casefold().split())
+    cached = _WEB_SEARCH_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
-        from tavily import TavilyClient  # type: ignore
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        results = client.search(
+        results = await _get_tavily().search(
             query=query,
             search_depth="basic",
             max_results=5,
             include_answer=True,
         )
-        return json.dumps(
-            {
-                "answer": results.get("answer", ""),
-                "results": [
-                    {"title": r["title"], "url": r["url"], "content": r["content"][:500]}
-                    for r in results.get("results", [])[:3]
-                ],
-            },
-            ensure_ascii=False,
-        )
     except Exception as e:
         logger.error("tavily_search_error", error=str(e))
-        return json.dumps({"error": str(e), "results": []})
+        return dumps({"error": str(e), "results": []})
+    payload = dumps(
+        {
+            "answer": results.get("answer", ""),
+            "results": [
+                {"title": r["title"], "url": r["url"], "content": r["content"][:500]}
+                for r in results.get("results", [])[:3]
+            ],
+        }
+    )
+    _WEB_SEARCH_CACHE.set(key, payload)
+    return payload
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Semantic routing
+# ─────────────────────────────────────────────────────────────────────────────
+
+_PRODUCT_ID = re.compile(r"\bprod-\d+\b", re.IGNORECASE)
+
+
+def _product_id_args(query: str) -> dict[str, Any] | None:
+    match = _PRODUCT_ID.search(query)
+    return {"product_id": match.group().lower()} if match else None
+
+
+# Single-tool intents (from the agent card's skill examples) whose arguments
+# can be read straight off the query. A close match skips the planning LLM call.
+_ROUTES: dict[str, tuple[list[str], Callable[[str], dict[str, Any] | None]]] = {
+    "get_product_details": (
+        ["prod-001 hakkında bilgi ver", "prod-003 özellikleri nedir?", "prod-005 detaylarını göster"],
+        _product_id_args,
+    ),
+    "check_product_availability": (
+        ["prod-001 stokta var mı?", "prod-004 şu an satışta mı?", "prod-002 indirimde mi?"],
+        _product_id_args,
+    ),
+    "web_search_products": (
+        ["Sony WH-1000XM5 piyasa fiyatı nedir?", "MacBook Pro yorumları", "iPhone 15 incelemeleri"],
+        lambda query: {"query": query},
+    ),
+}
+_ROUTER: EmbeddingRouter | None = None
+if settings.semantic_routing_enabled:
+    _embeddings = OpenAIEmbeddings(
+        model=settings.embedding_model,
+        dimensions=settings.embedding_dimensions,
+        api_key=settings.openai_api_key,
+    )
+    _ROUTER = EmbeddingRouter(
+        embed_documents=_embeddings.aembed_documents,
+        embed_query=_embeddings.aembed_query,
+        routes={name: examples for name, (examples, _) in _ROUTES.items()},
+        threshold=settings.semantic_routing_threshold,
+    )
+
+
+async def plan_direct_tool_call(messages: list[BaseMessage]) -> AIMessage | None:
+    """Return a ready-made tool call for a fresh query with an obvious intent."""
+    if _ROUTER is None or len(messages) != 1 or not isinstance(messages[0], HumanMessage):
+        return None
+    query = messages[0].content
+    if not isinstance(query, str):
+        return None
+    try:
+        tool_name = await _ROUTER.route(query)
+    except Exception as e:
+        logger.warning("semantic_route_error", error=str(e))
+        return None
+    if tool_name is None:
+        return None
+    args = _ROUTES[tool_name][1](query)
+    if args is None:
+        return None
+    logger.info("semantic_route", tool=tool_name)
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": tool_name, "args": args, "id": f"call_{uuid.uuid4().hex}"}],
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -205,11 +324,38 @@ Kurallar:
 - İndirim varsa orijinal fiyatı ve indirim oranını belirt
 - Stok durumunu her zaman kontrol et
 - Müşteriye en uygun seçeneği öner
-- Gerektiğinde web araması yaparak güncel bilgi getir"""
+- Gerektiğinde web araması yaparak güncel bilgi getir
+- Birbirinden bağımsız araç çağrılarını (ör. arama + öneri) aynı adımda birlikte yap"""
+
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
+
 
+@lru_cache(maxsize=1)
+def _get_llm() -> ChatOpenAI:
+    """Return the process-wide chat model.
 
+    It runs on an explicitly pooled client, so every session reuses warm
+    keep-alive connections to the OpenAI API. Built on first use so importing
+    this module does not require an API key.
+    """
+    return ChatOpenAI(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature,
+        max_tokens=settings.llm_max_tokens,
+        api_key=settings.openai_api_key,
+        http_async_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
 def build_product_agent() -> Any:
-    """Build and return the compiled LangGraph product agent."""
+    """Build and return the compiled LangGraph product agent.
+
+    The graph is built once per process and shared by every caller.
+    """
     tools = [
         search_products,
         get_product_details,
@@ -219,13 +365,33 @@ def build_product_agent() -> Any:
         web_search_products,
     ]
 
-    llm = ChatOpenAI(
-        model=settings.llm_model,
-        temperature=settings.llm_temperature,
-        max_tokens=settings.llm_max_tokens,
-        api_key=settings.openai_api_key,
-    ).bind_tools(tools)
+    llm = _get_llm().bind_tools(tools, parallel_tool_calls=True)
+    llm_cache = (
+        LLMCache(
+            model=settings.llm_model,
+            temperature=settings.llm_temperature,
+            tool_names=[t.name for t in tools],
+            ttl=settings.llm_cache_ttl,
+            semantic=(
+                SemanticCache(
+                    embed=OpenAIEmbeddings(
+                        model=settings.embedding_model,
+                        dimensions=settings.embedding_dimensions,
+                        api_key=settings.openai_api_key,
+                    ).aembed_query,
+                    threshold=settings.semantic_cache_threshold,
+                    ttl=settings.llm_cache_ttl,
+                )
+                if settings.semantic_cache_enabled
+                else None
+            ),
+        )
+        if settings.llm_cache_enabled
+        else None
+    )
 
+    # ToolNode awaits all tool calls of one model turn with asyncio.gather, so
+    # independent MCP calls requested together run concurrently.
     tool_node = ToolNode(tools)
 
     def should_continue(state: ProductAgentState) -> str:
@@ -235,15 +401,31 @@ def build_product_agent() -> Any:
         return END
 
     async def call_model(state: ProductAgentState) -> dict[str, Any]:
-        from langchain_core.messages import SystemMessage
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + state["messages"]
+        messages = [_SYSTEM_MSG, *state["messages"]]
+        if llm_cache is not None and (cached := await llm_cache.get(messages)) is not None:
+            logger.info("product_llm_cache_hit")
+            return {"messages": [cached]}
         response = await llm.ainvoke(messages)
+        if llm_cache is not None:
+            await llm_cache.set(messages, response)
         return {"messages": [response]}
 
+    async def route_query(state: ProductAgentState) -> dict[str, Any]:
+        plan = await plan_direct_tool_call(state["messages"])
+        return {"messages": [plan]} if plan is not None else {}
+
+    def after_route(state: ProductAgentState) -> str:
+        return "tools" if should_continue(state) == "tools" else "agent"
+
     graph = StateGraph(ProductAgentState)
     graph.add_node("agent", call_model)
     graph.add_node("tools", tool_node)
-    graph.add_edge(START, "agent")
+    if _ROUTER is not None:
+        graph.add_node("router", route_query)
+        graph.add_edge(START, "router")
+        graph.add_conditional_edges("router", after_route, {"tools": "tools", "agent": "agent"})
+    else:
+        graph.add_edge(START, "agent")
     graph.add_conditional_edges("agent", should_continue, {"tools": "tools", END: END})
     graph.add_edge("tools", "agent")
 
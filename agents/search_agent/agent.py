@@ -4,22 +4,22 @@ trend analysis, and market research using Tavily.
 """
 from __future__ import annotations
 
-import json
-import sys
-from pathlib import Path
+import asyncio
+from functools import lru_cache
 from typing import Annotated, Any, TypedDict
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
+import httpx
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.tools import tool
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
+from utils.cache import TTLCache
 from utils.config import get_settings
 from utils.logging import get_logger
+from utils.serialization import dumps
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -30,184 +30,229 @@ class SearchAgentState(TypedDict):
     session_id: str
 
 
+# Checked once: without a key the search tools are replaced by a single stub
+# (see build_search_agent), so they never run and their schemas are not sent.
+_TAVILY_ENABLED = bool(settings.tavily_api_key)
+_DISABLED_PAYLOAD = dumps(
+    {"message": "TAVILY_API_KEY yapılandırılmamış. Web araması devre dışı.", "results": []}
+)
+
+# One client for the process, so the TLS connection to Tavily is reused
+# across tool calls instead of being renegotiated every time.
+_TAVILY: Any = None
+# Caps in-flight Tavily requests so bursts do not run into its rate limit.
+_TAVILY_LIMIT = asyncio.Semaphore(settings.tavily_max_concurrency)
+# Search results keyed by normalized query and search parameters. General web
+# results go stale faster than prices, reviews and trends.
+_WEB_SEARCH_CACHE: TTLCache[tuple, dict] = TTLCache(maxsize=256, ttl=300)
+_MARKET_SEARCH_CACHE: TTLCache[tuple, dict] = TTLCache(maxsize=256, ttl=1800)
+
+
+def _get_tavily() -> Any:
+    """Return the shared async Tavily client, creating it on first use."""
+    global _TAVILY
+    if _TAVILY is None:
+        from tavily import AsyncTavilyClient  # type: ignore
+        _TAVILY = AsyncTavilyClient(api_key=settings.tavily_api_key)
+    return _TAVILY
+
+
+async def close_tavily_client() -> None:
+    """Close the shared Tavily client (called on server shutdown)."""
+    global _TAVILY
+    if _TAVILY is not None:
+        await _TAVILY.close()
+        _TAVILY = None
+
+
+async def _tavily_search(
+    cache: TTLCache[tuple, dict],
+    query: str,
+    *,
+    depth: str,
+    max_results: int,
+    content_limit: int,
+    **params: Any,
+) -> tuple[str, list[dict[str, Any]]]:
+    """Search Tavily and return its answer and hits, with content cut to ``content_limit``.
+
+    Responses are cached per normalized query and search parameters.
+    """
+    key = (" ".join(query.casefold().split()), depth, max_results, *sorted(params.items()))
+    results = cache.get(key)
+    if results is None:
+        async with _TAVILY_LIMIT:
+            results = await _get_tavily().search(
+                query=query,
+                search_depth=depth,
+                max_results=max_results,
+                include_answer=True,
+                include_raw_content=False,
+                **params,
+            )
+        cache.set(key, results)
+    hits = [
+        {
+            "title": r["title"],
+            "url": r["url"],
+            "content": r["content"][:content_limit],
+            "score": r.get("score", 0),
+        }
+        for r in results.get("results", [])[:max_results]
+    ]
+    return results.get("answer", ""), hits
+
+
+def _error_payload(e: Exception) -> str:
+    logger.error("tavily_error", error=str(e))
+    return dumps({"error": str(e), "results": []})
+
+
 @tool
 async def web_search(query: str, search_depth: str = "basic") -> str:
     """
     Web'de arama yap. Ürün incelemeleri, fiyat karşılaştırması, haberler veya
     herhangi bir güncel bilgi için kullan. search_depth 'basic' veya 'advanced' olabilir.
     """
-    if not settings.tavily_api_key:
-        return json.dumps({
-            "message": "TAVILY_API_KEY yapılandırılmamış. Web araması devre dışı.",
-            "results": [],
-        })
     try:
-        from tavily import TavilyClient  # type: ignore
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        results = client.search(
-            query=query,
-            search_depth=search_depth,
-            max_results=5,
-            include_answer=True,
-            include_raw_content=False,
-        )
-        return json.dumps(
-            {
-                "answer": results.get("answer", ""),
-                "results": [
-                    {
-                        "title": r["title"],
-                        "url": r["url"],
-                        "content": r["content"][:600],
-                        "score": r.get("score", 0),
-                    }
-                    for r in results.get("results", [])[:5]
-                ],
-            },
-            ensure_ascii=False,
+        answer, hits = await _tavily_search(
+            _WEB_SEARCH_CACHE, query, depth=search_depth, max_results=5, content_limit=600
         )
     except Exception as e:
-        logger.error("tavily_error", error=str(e))
-        return json.dumps({"error": str(e), "results": []})
+        return _error_payload(e)
+    return dumps({"answer": answer, "results": hits})
 
 
 @tool
 async def compare_prices(product_name: str) -> str:
     """Bir ürünün farklı platformlardaki fiyatlarını karşılaştır (Trendyol, Hepsiburada, Amazon TR, vb.)."""
-    if not settings.tavily_api_key:
-        return json.dumps({"message": "Web araması devre dışı.", "results": []})
+    query = f"{product_name} fiyat karşılaştırma Trendyol Hepsiburada Amazon 2025"
     try:
-        from tavily import TavilyClient  # type: ignore
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        query = f"{product_name} fiyat karşılaştırma Trendyol Hepsiburada Amazon 2025"
-        results = client.search(
-            query=query,
-            search_depth="basic",
-            max_results=6,
-            include_answer=True,
-        )
-        return json.dumps(
-            {
-                "product": product_name,
-                "answer": results.get("answer", ""),
-                "price_sources": [
-                    {
-                        "source": r["title"],
-                        "url": r["url"],
-                        "info": r["content"][:400],
-                    }
-                    for r in results.get("results", [])[:5]
-                ],
-            },
-            ensure_ascii=False,
+        answer, hits = await _tavily_search(
+            _MARKET_SEARCH_CACHE, query, depth="basic", max_results=5, content_limit=400
         )
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _error_payload(e)
+    return dumps(
+        {
+            "product": product_name,
+            "answer": answer,
+            "price_sources": [
+                {"source": h["title"], "url": h["url"], "info": h["content"]} for h in hits
+            ],
+        }
+    )
 
 
 @tool
 async def get_product_reviews_web(product_name: str) -> str:
     """Web'de bir ürünün kullanıcı yorumlarını ve uzman incelemelerini ara."""
-    if not settings.tavily_api_key:
-        return json.dumps({"message": "Web araması devre dışı.", "results": []})
+    query = f"{product_name} kullanıcı yorumları inceleme review 2024 2025"
     try:
-        from tavily import TavilyClient  # type: ignore
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        query = f"{product_name} kullanıcı yorumları inceleme review 2024 2025"
-        results = client.search(
-            query=query,
-            search_depth="advanced",
-            max_results=5,
-            include_answer=True,
-        )
-        return json.dumps(
-            {
-                "product": product_name,
-                "summary": results.get("answer", ""),
-                "reviews": [
-                    {
-                        "source": r["title"],
-                        "url": r["url"],
-                        "excerpt": r["content"][:500],
-                    }
-                    for r in results.get("results", [])[:4]
-                ],
-            },
-            ensure_ascii=False,
+        answer, hits = await _tavily_search(
+            _MARKET_SEARCH_CACHE,
+            query,
+            depth="advanced",
+            max_results=4,
+            content_limit=500,
+            # Advanced search returns up to three chunks per page; one is plenty
+            # for a 500-character excerpt.
+            chunks_per_source=1,
         )
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _error_payload(e)
+    return dumps(
+        {
+            "product": product_name,
+            "summary": answer,
+            "reviews": [
+                {"source": h["title"], "url": h["url"], "excerpt": h["content"]} for h in hits
+            ],
+        }
+    )
 
 
 @tool
 async def get_trending_products(category: str) -> str:
     """Belirli bir kategorideki trend ürünleri ve en çok satanları web'de ara."""
-    if not settings.tavily_api_key:
-        return json.dumps({"message": "Web araması devre dışı.", "results": []})
+    query = f"2025 en iyi {category} ürünleri trend çok satan"
     try:
-        from tavily import TavilyClient  # type: ignore
-        client = TavilyClient(api_key=settings.tavily_api_key)
-        query = f"2025 en iyi {category} ürünleri trend çok satan"
-        results = client.search(
-            query=query,
-            search_depth="basic",
-            max_results=5,
-            include_answer=True,
-        )
-        return json.dumps(
-            {
-                "category": category,
-                "trending_summary": results.get("answer", ""),
-                "sources": [
-                    {"title": r["title"], "url": r["url"], "content": r["content"][:400]}
-                    for r in results.get("results", [])[:4]
-                ],
-            },
-            ensure_ascii=False,
+        answer, hits = await _tavily_search(
+            _MARKET_SEARCH_CACHE, query, depth="basic", max_results=4, content_limit=400
         )
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _error_payload(e)
+    return dumps(
+        {
+            "category": category,
+            "trending_summary": answer,
+            "sources": [
+                {"title": h["title"], "url": h["url"], "content": h["content"]} for h in hits
+            ],
+        }
+    )
 
 
-SYSTEM_PROMPT = """Sen bir e-ticaret araştırma uzmanı AI asistanısın. Web aramalarını kullanarak
-müşterilere en doğru ve güncel bilgileri sağlarsın.
+@tool("web_search")
+async def web_search_disabled(query: str) -> str:
+    """Web araması (şu anda devre dışı)."""
+    return _DISABLED_PAYLOAD
 
-Yeteneklerin:
-- Web araması (ürün, fiyat, inceleme, haber)
-- Fiyat karşılaştırması (Trendyol, Hepsiburada, Amazon TR, vb.)
-- Kullanıcı yorumu ve uzman inceleme araması
-- Trend ürün ve kategori analizi
+
+SYSTEM_PROMPT = """Sen bir e-ticaret araştırma asistanısın; araçlarınla web'de ürün, fiyat,
+yorum ve trend araştırırsın.
 
 Kurallar:
-- Her zaman Türkçe yanıt ver
-- Kaynaklarını ve URL'leri belirt
-- Fiyat bilgilerinin tarihini/kaynağını açıkça belirt
-- Hatta negatif yorumları da tarafsızca sun
-- "Bu bilgi web aramasından alınmıştır, güncellik garantisi yoktur" notunu ekle"""
+- Türkçe yanıt ver
+- Kaynak URL'lerini ve fiyatların tarih/kaynağını belirt
+- Olumsuz yorumları da tarafsızca sun
+- "Bu bilgi web aramasından alınmıştır, güncellik garantisi yoktur" notunu ekle
+- Bağımsız aramaları (ör. fiyat + yorum) aynı adımda birlikte yap"""
 
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
 
-def build_search_agent() -> Any:
-    """Build and return the compiled LangGraph search agent."""
-    tools = [web_search, compare_prices, get_product_reviews_web, get_trending_products]
 
-    llm = ChatOpenAI(
+@lru_cache(maxsize=1)
+def _get_llm() -> ChatOpenAI:
+    """Return the chat model and connection pool shared by every graph run.
+
+    Built on first use so importing this module does not require an API key.
+    """
+    return ChatOpenAI(
         model=settings.llm_model,
         temperature=settings.llm_temperature,
         max_tokens=settings.llm_max_tokens,
         api_key=settings.openai_api_key,
-    ).bind_tools(tools)
+        http_async_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def build_search_agent() -> Any:
+    """Build and return the compiled LangGraph search agent.
+
+    The graph is built once per process and shared by every caller.
+    """
+    if _TAVILY_ENABLED:
+        tools = [web_search, compare_prices, get_product_reviews_web, get_trending_products]
+    else:
+        logger.warning("tavily_disabled")
+        tools = [web_search_disabled]
+
+    llm = _get_llm().bind_tools(tools, parallel_tool_calls=True)
 
+    # ToolNode runs all tool calls of one AIMessage concurrently.
     tool_node = ToolNode(tools)
 
     def should_continue(state: SearchAgentState) -> str:
-        last = state["messages"][-1]
-        if isinstance(last, AIMessage) and last.tool_calls:
-            return "tools"
-        return END
+        # Only AIMessage carries tool_calls; other message types fall through.
+        return "tools" if getattr(state["messages"][-1], "tool_calls", None) else END
 
     async def call_model(state: SearchAgentState) -> dict[str, Any]:
-        from langchain_core.messages import SystemMessage
-        messages = [SystemMessage(content=SYSTEM_PROMPT)] + state["messages"]
+        messages = [_SYSTEM_MSG] + state["messages"]
         response = await llm.ainvoke(messages)
         return {"messages": [response]}
 
@@ -1,10 +1,8 @@
 """A2A AgentExecutor wrapping the LangGraph Search Agent."""
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+import asyncio
+import uuid
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
@@ -18,20 +16,41 @@ from a2a.types import (
 )
 from a2a.utils import new_task
 from a2a.utils.errors import ServerError
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
 from typing_extensions import override
 
 from agents.search_agent.agent import build_search_agent
+from utils.config import get_settings
 from utils.logging import get_logger
+from utils.streaming import TokenBatcher
 
+settings = get_settings()
 logger = get_logger(__name__)
 
+NO_RESULT_TEXT = "Web araması tamamlandı ancak sonuç bulunamadı."
+
+
+def _response_text(messages: list[BaseMessage]) -> str:
+    """Return the text of the newest AI reply with content, or ``NO_RESULT_TEXT``."""
+    last_msg = next(
+        (m for m in reversed(messages) if isinstance(m, AIMessage) and m.content), None
+    )
+    content = last_msg.content if last_msg is not None else ""
+    if isinstance(content, list):
+        content = " ".join(
+            c["text"] for c in content if isinstance(c, dict) and c.get("type") == "text"
+        )
+    return content or NO_RESULT_TEXT
+
 
 class SearchAgentExecutor(AgentExecutor):
     """Wraps the LangGraph Search Agent as an A2A-compliant executor."""
 
     def __init__(self) -> None:
         self.agent = build_search_agent()
+        # Bounds concurrent graph runs so a burst of tasks queues here instead
+        # of piling up OpenAI and Tavily requests that end in 429 retries.
+        self._runs = asyncio.Semaphore(settings.max_concurrent_searches)
         logger.info("search_agent_executor_initialized")
 
     @override
@@ -60,29 +79,31 @@ class SearchAgentExecutor(AgentExecutor):
             )
 
             messages = [HumanMessage(content=query)]
-            final_response = ""
-
-            async for chunk in self.agent.astream(
-                {"messages": messages, "session_id": task.context_id},
-                stream_mode="values",
-            ):
-                msgs = chunk.get("messages", [])
-                if msgs:
-                    last_msg = msgs[-1]
-                    if isinstance(last_msg, AIMessage) and last_msg.content:
-                        content = last_msg.content
-                        if isinstance(content, list):
-                            text_parts = [
-                                c["text"]
-                                for c in content
-                                if isinstance(c, dict) and c.get("type") == "text"
-                            ]
-                            final_response = " ".join(text_parts)
-                        elif isinstance(content, str):
-                            final_response = content
-
-            if not final_response:
-                final_response = "Web araması tamamlandı ancak sonuç bulunamadı."
+            # Only the agent node's latest reply is kept: "updates" mode yields
+            # per-node deltas instead of re-sending the whole state every step.
+            replies: list[BaseMessage] = []
+            tokens = TokenBatcher(updater)
+            async with self._runs:
+                async for mode, chunk in self.agent.astream(
+                    {"messages": messages, "session_id": task.context_id},
+                    stream_mode=["messages", "updates"],
+                ):
+                    if mode == "updates":
+                        if "agent" in chunk:
+                            replies = chunk["agent"]["messages"]
+                        continue
+                    # Forward model tokens as they are generated, in small batches.
+                    msg_chunk, metadata = chunk
+                    if (
+                        metadata.get("langgraph_node") == "agent"
+                        and isinstance(msg_chunk, AIMessageChunk)
+                        and isinstance(msg_chunk.content, str)
+                        and msg_chunk.content
+                    ):
+                        await tokens.add(msg_chunk.content)
+            await tokens.flush()
+
+            final_response = _response_text(replies)
 
             await updater.add_artifact(
                 parts=[Part(root=TextPart(text=final_response))],
@@ -99,6 +120,26 @@ class SearchAgentExecutor(AgentExecutor):
                 )
             )
 
+    async def run_batch(self, queries: list[str], max_concurrency: int = 10) -> list[str]:
+        """Answer many queries outside A2A (evaluation, benchmarks), in input order.
+
+        Runs go through the graph's ``abatch`` with at most ``max_concurrency``
+        in flight, sharing the pooled OpenAI and Tavily clients. A failed query
+        yields its error text instead of aborting the batch.
+        """
+        inputs = [
+            {"messages": [HumanMessage(content=q)], "session_id": uuid.uuid4().hex}
+            for q in queries
+        ]
+        states = await self.agent.abatch(
+            inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True
+        )
+        return [
+            f"Arama hatası: {state}" if isinstance(state, Exception)
+            else _response_text(state.get("messages", []))
+            for state in states
+        ]
+
     @override
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         raise ServerError(error=UnsupportedOperationError())
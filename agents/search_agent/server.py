@@ -1,17 +1,17 @@
 """A2A HTTP Server for the Search Agent."""
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from starlette.applications import Starlette
 
+from agents.search_agent.agent import close_tavily_client
 from agents.search_agent.executor import SearchAgentExecutor
 from utils.config import get_settings
 from utils.logging import configure_logging, get_logger
@@ -32,7 +32,7 @@ def get_agent_card(host: str, port: int) -> AgentCard:
         version="1.0.0",
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
-        capabilities=AgentCapabilities(streaming=False),
+        capabilities=AgentCapabilities(streaming=True),
         skills=[
             AgentSkill(
                 id="web_search",
@@ -66,6 +66,13 @@ def get_agent_card(host: str, port: int) -> AgentCard:
     )
 
 
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Release the pooled Tavily connections when the server shuts down."""
+    yield
+    await close_tavily_client()
+
+
 def main() -> None:
     host = "0.0.0.0"
     port = settings.search_agent_port
@@ -81,7 +88,7 @@ def main() -> None:
     )
 
     logger.info("search_agent_server_starting", host=host, port=port)
-    uvicorn.run(server.build(), host=host, port=port, log_level=settings.log_level.lower())
+    uvicorn.run(server.build(lifespan=lifespan), host=host, port=port, log_level=settings.log_level.lower())
 
 
 if __name__ == "__main__":
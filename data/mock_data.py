@@ -1,9 +1,17 @@
 """Mock data generator for the e-commerce system."""
 from __future__ import annotations
 
-import json
-from datetime import datetime, timedelta
+import heapq
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from functools import cache, lru_cache
 from pathlib import Path
+from typing import Any
+
+import orjson
 
 from utils.models import (
     Customer,
@@ -21,7 +29,7 @@ from utils.models import (
 # Products
 # ─────────────────────────────────────────────────────────────────────────────
 
-PRODUCTS: list[Product] = [
+PRODUCTS: tuple[Product, ...] = (
     Product(
         id="prod-001",
         name="Sony WH-1000XM5 Kablosuz Kulaklık",
@@ -279,13 +287,124 @@ PRODUCTS: list[Product] = [
             "Bardak Boyutları": "5 farklı",
         },
     ),
+)
+
+# Lookup indexes over the static catalog, built once at import.
+_PRODUCTS_BY_ID: dict[str, Product] = {p.id: p for p in PRODUCTS}
+# Lowercased name, description, brand and tags per product, aligned with
+# PRODUCTS. NUL-separated so a query cannot match across two fields.
+_PRODUCT_SEARCH_BLOBS: list[str] = [
+    "\0".join([p.name, p.description, p.brand, *p.tags]).lower() for p in PRODUCTS
 ]
 
+_WORD_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def _token_index() -> dict[str, frozenset[int]]:
+    """Word -> indexes of the products whose search text contains it.
+
+    Built on the first search, so importers that never search skip it.
+    """
+    index: defaultdict[str, set[int]] = defaultdict(set)
+    for i, blob in enumerate(_PRODUCT_SEARCH_BLOBS):
+        for token in _WORD_RE.findall(blob):
+            index[token].add(i)
+    return {token: frozenset(ids) for token, ids in index.items()}
+
+
+@lru_cache(maxsize=1)
+def _vocabulary() -> tuple[list[str], str, list[int]]:
+    """The indexed words, joined NUL-separated into one string, and each word's offset."""
+    words = list(_token_index())
+    starts, offset = [], 0
+    for word in words:
+        starts.append(offset)
+        offset += len(word) + 1
+    return words, "\0".join(words), starts
+
+
+@lru_cache(maxsize=1024)
+def _products_matching_token(token: str) -> frozenset[int]:
+    """Indexes of products with a word containing ``token`` (substring match).
+
+    Scans the joined vocabulary with ``str.find`` in C rather than testing
+    every word in a Python loop; offsets map back to words by bisection.
+    """
+    index = _token_index()
+    if len(token) < 3:
+        # Very short tokens hit most words; a plain loop beats hopping between hits.
+        return frozenset().union(*(ids for word, ids in index.items() if token in word))
+    words, text, starts = _vocabulary()
+    postings = []
+    pos = text.find(token)
+    while pos != -1:
+        i = bisect_right(starts, pos) - 1
+        postings.append(index[words[i]])
+        if i + 1 == len(starts):
+            break
+        pos = text.find(token, starts[i + 1])
+    return frozenset().union(*postings)
+
+
+# Column views of the filterable fields, aligned with PRODUCTS, so filters scan
+# one flat list instead of dereferencing every Product model.
+_PRODUCT_CATEGORIES: list[ProductCategory] = [p.category for p in PRODUCTS]
+_PRODUCT_PRICES: list[float] = [p.price for p in PRODUCTS]
+_PRODUCT_IN_STOCK: list[bool] = [p.in_stock for p in PRODUCTS]
+_PRODUCT_RATINGS: list[float] = [p.rating for p in PRODUCTS]
+
+
+def _group_products_by_category() -> dict[ProductCategory, tuple[Product, ...]]:
+    groups: defaultdict[ProductCategory, list[Product]] = defaultdict(list)
+    for p in PRODUCTS:
+        groups[p.category].append(p)
+    return {category: tuple(products) for category, products in groups.items()}
+
+
+_PRODUCTS_BY_CATEGORY = _group_products_by_category()
+
+
+def _group_products_by_tag() -> dict[str, tuple[Product, ...]]:
+    groups: defaultdict[str, list[Product]] = defaultdict(list)
+    for p in PRODUCTS:
+        for tag in p.tags:
+            groups[tag].append(p)
+    return {tag: tuple(products) for tag, products in groups.items()}
+
+
+_PRODUCTS_BY_TAG = _group_products_by_tag()
+
+
+def _by_rating(products: tuple[Product, ...]) -> tuple[Product, ...]:
+    # Stable, so equally rated products keep their catalog order.
+    return tuple(sorted(products, key=lambda p: p.rating, reverse=True))
+
+
+_TOP_RATED = _by_rating(PRODUCTS)
+_TOP_RATED_BY_CATEGORY = {c: _by_rating(ps) for c, ps in _PRODUCTS_BY_CATEGORY.items()}
+_RATING_RANK: dict[str, int] = {p.id: rank for rank, p in enumerate(_TOP_RATED)}
+
+# Compact per-product view used in search results; the catalog is static, so
+# it is built once instead of per query.
+PRODUCT_SUMMARIES: dict[str, dict[str, Any]] = {
+    p.id: {
+        "id": p.id,
+        "name": p.name,
+        "price": p.price,
+        "rating": p.rating,
+        "in_stock": p.in_stock,
+        "brand": p.brand,
+        "category": p.category.value,
+    }
+    for p in PRODUCTS
+}
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Customers
 # ─────────────────────────────────────────────────────────────────────────────
 
-CUSTOMERS: list[Customer] = [
+CUSTOMERS: tuple[Customer, ...] = (
     Customer(
         id="cust-001",
         email="ahmet.yilmaz@example.com",
@@ -316,13 +435,38 @@ CUSTOMERS: list[Customer] = [
         loyalty_points=4567,
         created_at=datetime(2022, 7, 22),
     ),
+)
+
+_CUSTOMERS_BY_ID: dict[str, Customer] = {c.id: c for c in CUSTOMERS}
+
+
+def _email_key(email: str) -> str:
+    """Normalize an email for index keys and lookups alike."""
+    return email.strip().casefold()
+
+
+_CUSTOMERS_BY_EMAIL: dict[str, Customer] = {_email_key(c.email): c for c in CUSTOMERS}
+# Casefolded name and email per customer, aligned with CUSTOMERS.
+_CUSTOMER_SEARCH_KEYS: list[tuple[str, str]] = [
+    (c.full_name.casefold(), c.email.casefold()) for c in CUSTOMERS
 ]
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Orders
 # ─────────────────────────────────────────────────────────────────────────────
 
-ORDERS: list[Order] = [
+# One timestamp for the whole dataset keeps created/updated/tracking times
+# consistent with each other.
+_NOW = datetime.now(UTC)
+
+
+@cache
+def _address(**fields: str) -> ShippingAddress:
+    """Return one shared ShippingAddress per distinct address; they are frozen."""
+    return ShippingAddress(**fields)
+
+
+ORDERS: tuple[Order, ...] = (
     Order(
         id="ord-001",
         customer_id="cust-001",
@@ -337,7 +481,7 @@ ORDERS: list[Order] = [
             )
         ],
         status=OrderStatus.SHIPPED,
-        shipping_address=ShippingAddress(
+        shipping_address=_address(
             full_name="Ahmet Yılmaz",
             street="Atatürk Cad. No:42",
             city="İstanbul",
@@ -348,25 +492,25 @@ ORDERS: list[Order] = [
         shipping_cost=0.0,
         tax=161.99,
         total=1061.98,
-        created_at=datetime.utcnow() - timedelta(days=3),
-        updated_at=datetime.utcnow() - timedelta(hours=12),
+        created_at=_NOW - timedelta(days=3),
+        updated_at=_NOW - timedelta(hours=12),
         tracking_number="TK123456789TR",
         estimated_delivery="2025-02-19",
         tracking_events=[
             TrackingEvent(
-                timestamp=datetime.utcnow() - timedelta(days=3),
+                timestamp=_NOW - timedelta(days=3),
                 status="Sipariş Alındı",
                 location="İstanbul Depo",
                 description="Siparişiniz sisteme kaydedildi",
             ),
             TrackingEvent(
-                timestamp=datetime.utcnow() - timedelta(days=2),
+                timestamp=_NOW - timedelta(days=2),
                 status="Kargoya Verildi",
                 location="İstanbul Dağıtım Merkezi",
                 description="Paketiniz kargo firmasına teslim edildi",
             ),
             TrackingEvent(
-                timestamp=datetime.utcnow() - timedelta(hours=12),
+                timestamp=_NOW - timedelta(hours=12),
                 status="Dağıtımda",
                 location="İstanbul Avrupa Yakası Şube",
                 description="Paketiniz dağıtım şubesine ulaştı",
@@ -394,7 +538,7 @@ ORDERS: list[Order] = [
             ),
         ],
         status=OrderStatus.DELIVERED,
-        shipping_address=ShippingAddress(
+        shipping_address=_address(
             full_name="Ahmet Yılmaz",
             street="Atatürk Cad. No:42",
             city="İstanbul",
@@ -405,18 +549,18 @@ ORDERS: list[Order] = [
         shipping_cost=0.0,
         tax=266.39,
         total=1746.36,
-        created_at=datetime.utcnow() - timedelta(days=15),
-        updated_at=datetime.utcnow() - timedelta(days=10),
+        created_at=_NOW - timedelta(days=15),
+        updated_at=_NOW - timedelta(days=10),
         tracking_number="TK987654321TR",
         tracking_events=[
             TrackingEvent(
-                timestamp=datetime.utcnow() - timedelta(days=15),
+                timestamp=_NOW - timedelta(days=15),
                 status="Sipariş Alındı",
                 location="İstanbul Depo",
                 description="Siparişiniz sisteme kaydedildi",
             ),
             TrackingEvent(
-                timestamp=datetime.utcnow() - timedelta(days=10),
+                timestamp=_NOW - timedelta(days=10),
                 status="Teslim Edildi",
                 location="İstanbul",
                 description="Paketiniz kapıda teslim edildi",
@@ -437,7 +581,7 @@ ORDERS: list[Order] = [
             )
         ],
         status=OrderStatus.PROCESSING,
-        shipping_address=ShippingAddress(
+        shipping_address=_address(
             full_name="Zeynep Kaya",
             street="Bağdat Cad. No:15",
             city="İstanbul",
@@ -448,8 +592,8 @@ ORDERS: list[Order] = [
         shipping_cost=0.0,
         tax=396.0,
         total=2595.99,
-        created_at=datetime.utcnow() - timedelta(hours=6),
-        updated_at=datetime.utcnow() - timedelta(hours=2),
+        created_at=_NOW - timedelta(hours=6),
+        updated_at=_NOW - timedelta(hours=2),
         estimated_delivery="2025-02-20",
     ),
     Order(
@@ -466,7 +610,7 @@ ORDERS: list[Order] = [
             )
         ],
         status=OrderStatus.CONFIRMED,
-        shipping_address=ShippingAddress(
+        shipping_address=_address(
             full_name="Mehmet Demir",
             street="Cumhuriyet Mah. 456. Sok. No:7",
             city="Ankara",
@@ -477,78 +621,165 @@ ORDERS: list[Order] = [
         shipping_cost=0.0,
         tax=9899.99,
         total=64899.98,
-        created_at=datetime.utcnow() - timedelta(hours=2),
-        updated_at=datetime.utcnow() - timedelta(hours=1),
+        created_at=_NOW - timedelta(hours=2),
+        updated_at=_NOW - timedelta(hours=1),
         estimated_delivery="2025-02-22",
     ),
-]
+)
+
+_ORDERS_BY_ID: dict[str, Order] = {o.id: o for o in ORDERS}
+
+
+def _group_orders(key: Callable[[Order], str]) -> dict[str, tuple[Order, ...]]:
+    groups: defaultdict[str, list[Order]] = defaultdict(list)
+    for o in ORDERS:
+        groups[key(o)].append(o)
+    # Plain dict, so looking up an unknown key does not create a bucket.
+    return {k: tuple(orders) for k, orders in groups.items()}
+
+
+_ORDERS_BY_CUSTOMER = _group_orders(lambda o: o.customer_id)
+_ORDERS_BY_EMAIL = _group_orders(lambda o: _email_key(o.customer_email))
 
 
 def get_product_by_id(product_id: str) -> Product | None:
-    return next((p for p in PRODUCTS if p.id == product_id), None)
+    return _PRODUCTS_BY_ID.get(product_id)
+
+
+def get_products_by_category(category: ProductCategory) -> tuple[Product, ...]:
+    return _PRODUCTS_BY_CATEGORY.get(category, ())
+
 
+def get_top_rated_products(
+    limit: int, category: ProductCategory | None = None
+) -> tuple[Product, ...]:
+    """Return the ``limit`` best rated products, optionally within one category."""
+    ranked = _TOP_RATED if category is None else _TOP_RATED_BY_CATEGORY.get(category, ())
+    return ranked[:limit]
 
-def get_products_by_category(category: ProductCategory) -> list[Product]:
-    return [p for p in PRODUCTS if p.category == category]
 
+def get_related_products(product: Product, limit: int) -> list[Product]:
+    """Return the best rated products sharing a category or a tag with ``product``."""
+    related = {p.id: p for p in _PRODUCTS_BY_CATEGORY.get(product.category, ())}
+    for tag in product.tags:
+        related.update((p.id, p) for p in _PRODUCTS_BY_TAG.get(tag, ()))
+    related.pop(product.id, None)
+    return heapq.nsmallest(limit, related.values(), key=lambda p: _RATING_RANK[p.id])
 
-def search_products(query: str) -> list[Product]:
+
+def filter_products(
+    price_lt: float | None = None,
+    in_stock: bool | None = None,
+    category: ProductCategory | None = None,
+) -> list[Product]:
+    """Return products matching every given filter; ``None`` leaves a field unconstrained."""
+    return [
+        p
+        for p, price, stocked, cat in zip(
+            PRODUCTS, _PRODUCT_PRICES, _PRODUCT_IN_STOCK, _PRODUCT_CATEGORIES
+        )
+        if (price_lt is None or price < price_lt)
+        and (in_stock is None or stocked == in_stock)
+        and (category is None or cat == category)
+    ]
+
+
+def search_products(
+    query: str,
+    *,
+    category: ProductCategory | None = None,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+    in_stock_only: bool = False,
+) -> list[Product]:
+    """Case-insensitive substring search over name, description, brand and tags.
+
+    Every word of the query must occur inside some word of a match, so the
+    token index narrows the candidates and the full substring test only runs
+    on those. The optional filters are checked against the column views
+    before any Product is touched.
+    """
     query_lower = query.lower()
-    results = []
-    for product in PRODUCTS:
-        if (
-            query_lower in product.name.lower()
-            or query_lower in product.description.lower()
-            or any(query_lower in tag.lower() for tag in product.tags)
-            or query_lower in product.brand.lower()
-        ):
-            results.append(product)
-    return results
+    candidates: frozenset[int] | None = None
+    for token in _WORD_RE.findall(query_lower):
+        matches = _products_matching_token(token)
+        candidates = matches if candidates is None else candidates & matches
+        if not candidates:
+            # Most misses come from one unknown word; skip the remaining ones.
+            return []
+    order = range(len(PRODUCTS)) if candidates is None else sorted(candidates)
+    return [
+        PRODUCTS[i]
+        for i in order
+        if (category is None or _PRODUCT_CATEGORIES[i] == category)
+        and (max_price is None or _PRODUCT_PRICES[i] <= max_price)
+        and (min_rating is None or _PRODUCT_RATINGS[i] >= min_rating)
+        and (not in_stock_only or _PRODUCT_IN_STOCK[i])
+        and query_lower in _PRODUCT_SEARCH_BLOBS[i]
+    ]
 
 
 def get_order_by_id(order_id: str) -> Order | None:
-    return next((o for o in ORDERS if o.id == order_id), None)
+    return _ORDERS_BY_ID.get(order_id)
 
 
-def get_orders_by_customer(customer_id: str) -> list[Order]:
-    return [o for o in ORDERS if o.customer_id == customer_id]
+def get_orders_by_customer(customer_id: str) -> tuple[Order, ...]:
+    return _ORDERS_BY_CUSTOMER.get(customer_id, ())
 
 
-def get_orders_by_email(email: str) -> list[Order]:
-    return [o for o in ORDERS if o.customer_email.lower() == email.lower()]
+def get_orders_by_email(email: str) -> tuple[Order, ...]:
+    return _ORDERS_BY_EMAIL.get(_email_key(email), ())
 
 
 def get_customer_by_id(customer_id: str) -> Customer | None:
-    return next((c for c in CUSTOMERS if c.id == customer_id), None)
+    return _CUSTOMERS_BY_ID.get(customer_id)
 
 
 def get_customer_by_email(email: str) -> Customer | None:
-    return next((c for c in CUSTOMERS if c.email.lower() == email.lower()), None)
+    return _CUSTOMERS_BY_EMAIL.get(_email_key(email))
 
 
 def search_customers(query: str) -> list[Customer]:
     """Search customers by name or email (case-insensitive)."""
-    q = query.lower()
+    q = query.casefold()
     return [
-        c for c in CUSTOMERS
-        if q in c.full_name.lower() or q in c.email.lower()
+        c for c, (name, email) in zip(CUSTOMERS, _CUSTOMER_SEARCH_KEYS)
+        if q in name or q in email
     ]
 
 
+# The mock data never changes, so each file's contents are rendered once.
+@lru_cache(maxsize=1)
+def _products_json() -> bytes:
+    return orjson.dumps([p.model_dump() for p in PRODUCTS], option=orjson.OPT_INDENT_2)
+
+
+@lru_cache(maxsize=1)
+def _customers_json() -> bytes:
+    return orjson.dumps([c.model_dump() for c in CUSTOMERS], option=orjson.OPT_INDENT_2)
+
+
+@lru_cache(maxsize=1)
+def _orders_json() -> bytes:
+    return orjson.dumps([o.model_dump() for o in ORDERS], option=orjson.OPT_INDENT_2)
+
+
 def save_mock_data_to_json(output_dir: str = "./data") -> None:
     """Save mock data to JSON files for inspection."""
+    # Imported here: only this helper needs it, and the agents import this module.
+    from concurrent.futures import ThreadPoolExecutor
+
     path = Path(output_dir)
     path.mkdir(exist_ok=True)
 
-    (path / "products.json").write_text(
-        json.dumps([p.model_dump() for p in PRODUCTS], indent=2, default=str)
-    )
-    (path / "customers.json").write_text(
-        json.dumps([c.model_dump() for c in CUSTOMERS], indent=2, default=str)
-    )
-    (path / "orders.json").write_text(
-        json.dumps([o.model_dump() for o in ORDERS], indent=2, default=str)
-    )
+    files = {
+        "products.json": _products_json(),
+        "customers.json": _customers_json(),
+        "orders.json": _orders_json(),
+    }
+    # The writes are independent; threads release the GIL while writing.
+    with ThreadPoolExecutor(max_workers=len(files)) as pool:
+        list(pool.map(lambda item: (path / item[0]).write_bytes(item[1]), files.items()))
     print(f"Mock data saved to {output_dir}")
 
 
@@ -0,0 +1,30 @@
+"""
+Gunicorn config for running an agent server with several uvicorn workers.
+
+    AGENT_PORT=8006 gunicorn -c gunicorn_conf.py "agents.product_agent.server:build_app()"
+
+Workers do not share memory: set REDIS_URL so A2A tasks are visible to every
+worker. WEB_CONCURRENCY overrides the worker count.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('AGENT_PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn_worker.UvicornWorker"
+# Import the app (and compile the LangGraph agent) once, then fork.
+preload_app = True
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Freeze everything the preloaded app allocated before workers fork.
+
+    The mock catalog, compiled graphs and models are never freed, so moving
+    them to the GC's permanent generation keeps collections from scanning
+    them and keeps forked workers from dirtying their shared pages.
+    """
+    gc.freeze()
@@ -12,11 +12,12 @@ from pathlib import Path
 # ensure project root is on path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 import uvicorn
 from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.sse import SseServerTransport
 from mcp.types import (
     Resource,
@@ -24,8 +25,10 @@ from mcp.types import (
     Tool,
 )
 from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 from starlette.routing import Mount, Route
 
 from data.mock_data import (
@@ -39,11 +42,22 @@ from data.mock_data import (
     get_orders_by_email,
     get_product_by_id,
     get_products_by_category,
+    get_related_products,
+    get_top_rated_products,
+    search_customers,
     search_products,
 )
 from utils.config import get_settings
 from utils.logging import configure_logging, get_logger
-from utils.models import OrderStatus, ProductCategory
+from utils.models import Customer, Order, OrderStatus, Product, ProductCategory
+from utils.serialization import (
+    MSGPACK,
+    MsgpackResponse,
+    ORJSONResponse,
+    dumps,
+    dumps_bytes,
+    loads_msgpack,
+)
 
 settings = get_settings()
 configure_logging(settings.log_level, "mcp-server")
@@ -59,381 +73,491 @@ app = Server("ecommerce-mcp-server")
 # Resources  (read-only catalog views)
 # ─────────────────────────────────────────────────────────────────────────────
 
+RESOURCES: list[Resource] = [
+    Resource(
+        uri="ecommerce://products/catalog",
+        name="Product Catalog",
+        description="Full product catalog with prices, stock and ratings",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="ecommerce://orders/summary",
+        name="Orders Summary",
+        description="Recent orders summary",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="ecommerce://customers/list",
+        name="Customer List",
+        description="Customer database",
+        mimeType="application/json",
+    ),
+]
+
+
 @app.list_resources()  # type: ignore[arg-type]
 async def list_resources() -> list[Resource]:
-    return [
-        Resource(
-            uri="ecommerce://products/catalog",
-            name="Product Catalog",
-            description="Full product catalog with prices, stock and ratings",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="ecommerce://orders/summary",
-            name="Orders Summary",
-            description="Recent orders summary",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="ecommerce://customers/list",
-            name="Customer List",
-            description="Customer database",
-            mimeType="application/json",
-        ),
+    return RESOURCES
+
+
+def _resource_payloads() -> dict[str, str]:
+    """Serialize every resource once; the mock datasets are immutable."""
+    catalog = [
+        {
+            "id": p.id,
+            "name": p.name,
+            "category": p.category,
+            "price": p.price,
+            "original_price": p.original_price,
+            "rating": p.rating,
+            "review_count": p.review_count,
+            "in_stock": p.in_stock,
+            "stock": p.stock,
+            "brand": p.brand,
+        }
+        for p in PRODUCTS
     ]
+    orders = [
+        {
+            "id": o.id,
+            "customer_email": o.customer_email,
+            "status": o.status,
+            "total": o.total,
+            "item_count": len(o.items),
+            "created_at": o.created_at,
+        }
+        for o in ORDERS
+    ]
+    customers = [
+        {
+            "id": c.id,
+            "email": c.email,
+            "full_name": c.full_name,
+            "total_orders": c.total_orders,
+            "loyalty_points": c.loyalty_points,
+        }
+        for c in CUSTOMERS
+    ]
+    return {
+        "ecommerce://products/catalog": dumps(catalog),
+        "ecommerce://orders/summary": dumps(orders),
+        "ecommerce://customers/list": dumps(customers),
+    }
+
+
+_RESOURCE_PAYLOADS = _resource_payloads()
 
 
 @app.read_resource()  # type: ignore[arg-type]
-async def read_resource(uri: str) -> str:
-    if uri == "ecommerce://products/catalog":
-        data = [
-            {
-                "id": p.id,
-                "name": p.name,
-                "category": p.category,
-                "price": p.price,
-                "original_price": p.original_price,
-                "rating": p.rating,
-                "review_count": p.review_count,
-                "in_stock": p.in_stock,
-                "stock": p.stock,
-                "brand": p.brand,
-            }
-            for p in PRODUCTS
-        ]
-        return json.dumps(data, ensure_ascii=False)
-    elif uri == "ecommerce://orders/summary":
-        data = [
-            {
-                "id": o.id,
-                "customer_email": o.customer_email,
-                "status": o.status,
-                "total": o.total,
-                "item_count": len(o.items),
-                "created_at": o.created_at.isoformat(),
-            }
-            for o in ORDERS
-        ]
-        return json.dumps(data, ensure_ascii=False)
-    elif uri == "ecommerce://customers/list":
-        data = [
-            {
-                "id": c.id,
-                "email": c.email,
-                "full_name": c.full_name,
-                "total_orders": c.total_orders,
-                "loyalty_points": c.loyalty_points,
-            }
-            for c in CUSTOMERS
-        ]
-        return json.dumps(data, ensure_ascii=False)
-    raise ValueError(f"Unknown resource URI: {uri}")
+async def read_resource(uri: str) -> list[ReadResourceContents]:
+    payload = _RESOURCE_PAYLOADS.get(str(uri))
+    if payload is None:
+        raise ValueError(f"Unknown resource URI: {uri}")
+    return [ReadResourceContents(content=payload, mime_type="application/json")]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Tools
 # ─────────────────────────────────────────────────────────────────────────────
 
-@app.list_tools()  # type: ignore[arg-type]
-async def list_tools() -> list[Tool]:
-    return [
-        Tool(
-            name="search_products",
-            description="Search products by keyword in name, description, tags or brand",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search keyword"},
-                    "category": {
-                        "type": "string",
-                        "description": "Filter by category",
-                        "enum": [c.value for c in ProductCategory],
-                    },
-                    "max_price": {"type": "number", "description": "Maximum price filter"},
-                    "min_rating": {"type": "number", "description": "Minimum rating filter (1-5)"},
-                    "in_stock_only": {"type": "boolean", "description": "Return only in-stock items"},
+# Tool results are fed back to the LLM, so order lists and tracking histories
+# are capped to the most recent entries.
+DEFAULT_ORDER_LIMIT = 20
+MAX_TRACKING_EVENTS = 10
+
+
+_CATEGORIES: dict[str, ProductCategory] = {c.value: c for c in ProductCategory}
+_CATEGORY_VALUES = list(_CATEGORIES)
+
+TOOLS: list[Tool] = [
+    Tool(
+        name="search_products",
+        description="Search products by keyword in name, description, tags or brand",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search keyword"},
+                "category": {
+                    "type": "string",
+                    "description": "Filter by category",
+                    "enum": _CATEGORY_VALUES,
                 },
-                "required": ["query"],
+                "max_price": {"type": "number", "description": "Maximum price filter"},
+                "min_rating": {"type": "number", "description": "Minimum rating filter (1-5)"},
+                "in_stock_only": {"type": "boolean", "description": "Return only in-stock items"},
             },
-        ),
-        Tool(
-            name="get_product_details",
-            description="Get full details of a product by ID including reviews and specifications",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "product_id": {"type": "string", "description": "Product ID (e.g. prod-001)"},
-                },
-                "required": ["product_id"],
+            "required": ["query"],
+        },
+    ),
+    Tool(
+        name="get_product_details",
+        description="Get full details of a product by ID including reviews and specifications",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "product_id": {"type": "string", "description": "Product ID (e.g. prod-001)"},
             },
-        ),
-        Tool(
-            name="get_products_by_category",
-            description="List all products in a specific category",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "category": {
-                        "type": "string",
-                        "enum": [c.value for c in ProductCategory],
-                    },
+            "required": ["product_id"],
+        },
+    ),
+    Tool(
+        name="get_products_by_category",
+        description="List all products in a specific category",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "category": {
+                    "type": "string",
+                    "enum": _CATEGORY_VALUES,
                 },
-                "required": ["category"],
             },
-        ),
-        Tool(
-            name="check_product_availability",
-            description="Check if a product is in stock and get current price",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "product_id": {"type": "string"},
-                },
-                "required": ["product_id"],
+            "required": ["category"],
+        },
+    ),
+    Tool(
+        name="check_product_availability",
+        description="Check if a product is in stock and get current price",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "product_id": {"type": "string"},
             },
-        ),
-        Tool(
-            name="get_order_status",
-            description="Get current status and tracking info for an order",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "order_id": {"type": "string", "description": "Order ID (e.g. ord-001)"},
-                },
-                "required": ["order_id"],
+            "required": ["product_id"],
+        },
+    ),
+    Tool(
+        name="get_order_status",
+        description="Get current status and tracking info for an order",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "order_id": {"type": "string", "description": "Order ID (e.g. ord-001)"},
             },
-        ),
-        Tool(
-            name="get_customer_orders",
-            description="Get all orders for a customer by email or customer ID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "email": {"type": "string", "description": "Customer email"},
-                    "customer_id": {"type": "string", "description": "Customer ID"},
-                },
+            "required": ["order_id"],
+        },
+    ),
+    Tool(
+        name="get_customer_orders",
+        description="Get a customer's most recent orders by email or customer ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "email": {"type": "string", "description": "Customer email"},
+                "customer_id": {"type": "string", "description": "Customer ID"},
+                "limit": {"type": "integer", "description": "Max number of orders, newest first", "default": 20},
             },
-        ),
-        Tool(
-            name="get_customer_profile",
-            description="Get customer profile including loyalty points and order history",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "email": {"type": "string"},
-                    "customer_id": {"type": "string"},
-                },
+        },
+    ),
+    Tool(
+        name="get_customer_profile",
+        description="Get customer profile including loyalty points and order history",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "email": {"type": "string"},
+                "customer_id": {"type": "string"},
             },
-        ),
-        Tool(
-            name="get_recommendations",
-            description="Get product recommendations based on a product or category",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "product_id": {"type": "string", "description": "Base product for recommendations"},
-                    "category": {"type": "string", "description": "Category for recommendations"},
-                    "limit": {"type": "integer", "description": "Max number of recommendations", "default": 4},
-                },
+        },
+    ),
+    Tool(
+        name="get_recommendations",
+        description="Get product recommendations based on a product or category",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "product_id": {"type": "string", "description": "Base product for recommendations"},
+                "category": {"type": "string", "description": "Category for recommendations"},
+                "limit": {"type": "integer", "description": "Max number of recommendations", "default": 4},
             },
-        ),
-        Tool(
-            name="cancel_order",
-            description="Cancel a pending or confirmed order",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "order_id": {"type": "string"},
-                    "reason": {"type": "string", "description": "Reason for cancellation"},
-                },
-                "required": ["order_id"],
+        },
+    ),
+    Tool(
+        name="cancel_order",
+        description="Cancel a pending or confirmed order",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "order_id": {"type": "string"},
+                "reason": {"type": "string", "description": "Reason for cancellation"},
             },
-        ),
-        Tool(
-            name="search_customers",
-            description="Search for customers by name or email keyword",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Name or email to search for"},
-                },
-                "required": ["query"],
+            "required": ["order_id"],
+        },
+    ),
+    Tool(
+        name="search_customers",
+        description="Search for customers by name or email keyword",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Name or email to search for"},
             },
-        ),
-    ]
+            "required": ["query"],
+        },
+    ),
+]
+
+
+@app.list_tools()  # type: ignore[arg-type]
+async def list_tools() -> list[Tool]:
+    return TOOLS
 
 
 @app.call_tool()  # type: ignore[arg-type]
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     logger.info("tool_called", tool=name, args=arguments)
+    # The SDK checks arguments against inputSchema first, so handlers only see
+    # well-formed input and report misses as error dicts. Anything unexpected
+    # still becomes an isError result in the SDK's own handler.
+    result = await _dispatch_tool(name, arguments)
+    return [TextContent(type="text", text=dumps(result))]
+
+
+async def _tool_search_products(args: dict[str, Any]) -> Any:
+    # Falsy filter values leave that filter off.
+    category = args.get("category")
+    cat = _category(category) if category else None
+    if category and cat is None:
+        results = []
+    else:
+        results = search_products(
+            args["query"],
+            category=cat,
+            max_price=args.get("max_price") or None,
+            min_rating=args.get("min_rating") or None,
+            in_stock_only=bool(args.get("in_stock_only")),
+        )
+    return {
+        "products": [_product_summary(p) for p in results],
+        "total": len(results),
+        "query": args["query"],
+    }
 
-    try:
-        result = await _dispatch_tool(name, arguments)
-        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, default=str))]
-    except Exception as e:
-        logger.error("tool_error", tool=name, error=str(e))
-        return [TextContent(type="text", text=json.dumps({"error": str(e)}))]
-
-
-async def _dispatch_tool(name: str, args: dict[str, Any]) -> Any:  # noqa: PLR0912
-    if name == "search_products":
-        results = search_products(args["query"])
-        # apply optional filters
-        if args.get("category"):
-            results = [p for p in results if p.category.value == args["category"]]
-        if args.get("max_price"):
-            results = [p for p in results if p.price <= args["max_price"]]
-        if args.get("min_rating"):
-            results = [p for p in results if p.rating >= args["min_rating"]]
-        if args.get("in_stock_only"):
-            results = [p for p in results if p.in_stock]
-        return {
-            "products": [_product_summary(p) for p in results],
-            "total": len(results),
-            "query": args["query"],
-        }
 
-    elif name == "get_product_details":
-        product = get_product_by_id(args["product_id"])
-        if not product:
-            return {"error": f"Product {args['product_id']} not found"}
-        return product.model_dump()
-
-    elif name == "get_products_by_category":
-        try:
-            cat = ProductCategory(args["category"])
-        except ValueError:
-            return {"error": f"Unknown category: {args['category']}"}
-        products = get_products_by_category(cat)
-        return {"products": [_product_summary(p) for p in products], "category": args["category"]}
-
-    elif name == "check_product_availability":
-        product = get_product_by_id(args["product_id"])
-        if not product:
-            return {"error": f"Product {args['product_id']} not found"}
-        return {
-            "product_id": product.id,
-            "name": product.name,
-            "in_stock": product.in_stock,
-            "stock_count": product.stock,
-            "price": product.price,
-            "original_price": product.original_price,
-            "discount_percentage": product.discount_percentage,
-        }
+async def _tool_get_product_details(args: dict[str, Any]) -> Any:
+    product = get_product_by_id(args["product_id"])
+    if not product:
+        return {"error": f"Product {args['product_id']} not found"}
+    return _product_details(product)
 
-    elif name == "get_order_status":
-        order = get_order_by_id(args["order_id"])
-        if not order:
-            return {"error": f"Order {args['order_id']} not found"}
-        return {
-            "order_id": order.id,
-            "status": order.status.value,
-            "tracking_number": order.tracking_number,
-            "estimated_delivery": order.estimated_delivery,
-            "items": [{"name": i.product_name, "qty": i.quantity} for i in order.items],
-            "total": order.total,
-            "tracking_events": [
-                {
-                    "timestamp": e.timestamp.isoformat(),
-                    "status": e.status,
-                    "location": e.location,
-                    "description": e.description,
-                }
-                for e in order.tracking_events
-            ],
-        }
 
-    elif name == "get_customer_orders":
-        if args.get("email"):
-            orders = get_orders_by_email(args["email"])
-        elif args.get("customer_id"):
-            orders = get_orders_by_customer(args["customer_id"])
-        else:
-            return {"error": "Provide either email or customer_id"}
-        return {
-            "orders": [
-                {
-                    "id": o.id,
-                    "status": o.status.value,
-                    "total": o.total,
-                    "item_count": len(o.items),
-                    "created_at": o.created_at.isoformat(),
-                    "tracking_number": o.tracking_number,
-                }
-                for o in orders
-            ],
-            "total": len(orders),
-        }
+async def _tool_get_products_by_category(args: dict[str, Any]) -> Any:
+    cat = _category(args["category"])
+    if cat is None:
+        return {"error": f"Unknown category: {args['category']}"}
+    products = get_products_by_category(cat)
+    return {"products": [_product_summary(p) for p in products], "category": args["category"]}
 
-    elif name == "get_customer_profile":
-        if args.get("email"):
-            customer = get_customer_by_email(args["email"])
-        elif args.get("customer_id"):
-            customer = get_customer_by_id(args["customer_id"])
-        else:
-            return {"error": "Provide either email or customer_id"}
-        if not customer:
-            return {"error": "Customer not found"}
-        return customer.model_dump()
-
-    elif name == "get_recommendations":
-        if args.get("product_id"):
-            base = get_product_by_id(args["product_id"])
-            if base:
-                related = [
-                    p for p in PRODUCTS
-                    if p.id != base.id and (p.category == base.category or any(t in base.tags for t in p.tags))
-                ]
-                related.sort(key=lambda p: p.rating, reverse=True)
-                return {"recommendations": [_product_summary(p) for p in related[: args.get("limit", 4)]]}
-        if args.get("category"):
-            try:
-                cat = ProductCategory(args["category"])
-                products = get_products_by_category(cat)
-                products.sort(key=lambda p: p.rating, reverse=True)
-                return {"recommendations": [_product_summary(p) for p in products[: args.get("limit", 4)]]}
-            except ValueError:
-                pass
-        top = sorted(PRODUCTS, key=lambda p: p.rating, reverse=True)
-        return {"recommendations": [_product_summary(p) for p in top[: args.get("limit", 4)]]}
-
-    elif name == "cancel_order":
-        order = get_order_by_id(args["order_id"])
-        if not order:
-            return {"error": f"Order {args['order_id']} not found"}
-        if order.status not in (OrderStatus.PENDING, OrderStatus.CONFIRMED):
-            return {
-                "error": f"Order cannot be cancelled. Current status: {order.status.value}",
-                "cancellable": False,
+
+async def _tool_check_product_availability(args: dict[str, Any]) -> Any:
+    availability = _AVAILABILITY.get(args["product_id"])
+    if availability is None:
+        return {"error": f"Product {args['product_id']} not found"}
+    return availability.copy()
+
+
+async def _tool_get_order_status(args: dict[str, Any]) -> Any:
+    status = _ORDER_STATUS.get(args["order_id"])
+    if status is None:
+        return {"error": f"Order {args['order_id']} not found"}
+    return status.copy()
+
+
+async def _tool_get_customer_orders(args: dict[str, Any]) -> Any:
+    if args.get("email"):
+        orders = get_orders_by_email(args["email"])
+    elif args.get("customer_id"):
+        orders = get_orders_by_customer(args["customer_id"])
+    else:
+        return {"error": "Provide either email or customer_id"}
+    limit = args.get("limit", DEFAULT_ORDER_LIMIT)
+    recent = sorted(orders, key=lambda o: o.created_at, reverse=True)[:limit]
+    return {
+        "orders": [
+            {
+                "id": o.id,
+                "status": o.status.value,
+                "total": o.total,
+                "item_count": len(o.items),
+                "created_at": o.created_at,
+                "tracking_number": o.tracking_number,
             }
-        # In production this would update the DB; here we simulate
-        return {
-            "success": True,
-            "order_id": order.id,
-            "message": f"Order {order.id} has been cancelled successfully. Refund will be processed in 3-5 business days.",
-            "refund_amount": order.total,
-        }
+            for o in recent
+        ],
+        "total": len(orders),
+        "has_more": len(orders) > limit,
+    }
 
-    elif name == "search_customers":
-        query = args.get("query", "")
-        from data.mock_data import search_customers
-        results = search_customers(query)
+
+async def _tool_get_customer_profile(args: dict[str, Any]) -> Any:
+    if args.get("email"):
+        customer = get_customer_by_email(args["email"])
+    elif args.get("customer_id"):
+        customer = get_customer_by_id(args["customer_id"])
+    else:
+        return {"error": "Provide either email or customer_id"}
+    if not customer:
+        return {"error": "Customer not found"}
+    return _customer_profile(customer)
+
+
+async def _tool_get_recommendations(args: dict[str, Any]) -> Any:
+    limit = args.get("limit", 4)
+    if args.get("product_id"):
+        base = get_product_by_id(args["product_id"])
+        if base:
+            related = get_related_products(base, limit)
+            return {"recommendations": [_product_summary(p) for p in related]}
+    cat = _category(args.get("category"))
+    if cat is not None:
+        top = get_top_rated_products(limit, cat)
+        return {"recommendations": [_product_summary(p) for p in top]}
+    top = get_top_rated_products(limit)
+    return {"recommendations": [_product_summary(p) for p in top]}
+
+
+async def _tool_cancel_order(args: dict[str, Any]) -> Any:
+    order = get_order_by_id(args["order_id"])
+    if not order:
+        return {"error": f"Order {args['order_id']} not found"}
+    if order.status not in (OrderStatus.PENDING, OrderStatus.CONFIRMED):
         return {
-            "customers": [
-                {
-                    "id": c.id,
-                    "email": c.email,
-                    "full_name": c.full_name,
-                    "total_orders": c.total_orders,
-                }
-                for c in results
-            ],
-            "total": len(results),
-            "query": query,
+            "error": f"Order cannot be cancelled. Current status: {order.status.value}",
+            "cancellable": False,
         }
+    # In production this would update the DB; here we simulate
+    return {
+        "success": True,
+        "order_id": order.id,
+        "message": f"Order {order.id} has been cancelled successfully. Refund will be processed in 3-5 business days.",
+        "refund_amount": order.total,
+    }
 
-    else:
+
+async def _tool_search_customers(args: dict[str, Any]) -> Any:
+    query = args.get("query", "")
+    results = search_customers(query)
+    return {
+        "customers": [
+            {
+                "id": c.id,
+                "email": c.email,
+                "full_name": c.full_name,
+                "total_orders": c.total_orders,
+            }
+            for c in results
+        ],
+        "total": len(results),
+        "query": query,
+    }
+
+
+_TOOL_HANDLERS: dict[str, Callable[[dict[str, Any]], Awaitable[Any]]] = {
+    "search_products": _tool_search_products,
+    "get_product_details": _tool_get_product_details,
+    "get_products_by_category": _tool_get_products_by_category,
+    "check_product_availability": _tool_check_product_availability,
+    "get_order_status": _tool_get_order_status,
+    "get_customer_orders": _tool_get_customer_orders,
+    "get_customer_profile": _tool_get_customer_profile,
+    "get_recommendations": _tool_get_recommendations,
+    "cancel_order": _tool_cancel_order,
+    "search_customers": _tool_search_customers,
+}
+
+
+async def _dispatch_tool(name: str, args: dict[str, Any]) -> Any:
+    handler = _TOOL_HANDLERS.get(name)
+    if handler is None:
         return {"error": f"Unknown tool: {name}"}
+    return await handler(args)
+
+
+def _category(value: Any) -> ProductCategory | None:
+    """Map a category argument to its enum member, or ``None`` if unknown."""
+    return _CATEGORIES.get(value) if isinstance(value, str) else None
+
+
+def _availability(product: Product) -> dict[str, Any]:
+    return {
+        "product_id": product.id,
+        "name": product.name,
+        "in_stock": product.in_stock,
+        "stock_count": product.stock,
+        "price": product.price,
+        "original_price": product.original_price,
+        "discount_percentage": product.discount_percentage,
+    }
+
+
+def _order_status(order: Order) -> dict[str, Any]:
+    return {
+        "order_id": order.id,
+        "status": order.status.value,
+        "tracking_number": order.tracking_number,
+        "estimated_delivery": order.estimated_delivery,
+        "items": [{"name": i.product_name, "qty": i.quantity} for i in order.items],
+        "total": order.total,
+        "tracking_events": [
+            {
+                "timestamp": e.timestamp,
+                "status": e.status,
+                "location": e.location,
+                "description": e.description,
+            }
+            for e in order.tracking_events[-MAX_TRACKING_EVENTS:]
+        ],
+    }
+
+
+# Stock and order state never change in the mock datasets, so these tool
+# answers are built once per record. Callers get a shallow copy.
+_AVAILABILITY = {p.id: _availability(p) for p in PRODUCTS}
+_ORDER_STATUS = {o.id: _order_status(o) for o in ORDERS}
+
+
+def _product_details(p: Product) -> dict[str, Any]:
+    """Same shape as ``p.model_dump()``, built from attribute reads."""
+    return {
+        "id": p.id,
+        "name": p.name,
+        "description": p.description,
+        "category": p.category,
+        "price": p.price,
+        "original_price": p.original_price,
+        "stock": p.stock,
+        "brand": p.brand,
+        "sku": p.sku,
+        "rating": p.rating,
+        "review_count": p.review_count,
+        "reviews": [
+            {
+                "reviewer_name": r.reviewer_name,
+                "rating": r.rating,
+                "comment": r.comment,
+                "verified_purchase": r.verified_purchase,
+                "date": r.date,
+            }
+            for r in p.reviews
+        ],
+        "tags": p.tags,
+        "image_url": p.image_url,
+        "in_stock": p.in_stock,
+        "specifications": p.specifications,
+    }
+
+
+def _customer_profile(c: Customer) -> dict[str, Any]:
+    """Same shape as ``c.model_dump()``, built from attribute reads."""
+    return {
+        "id": c.id,
+        "email": c.email,
+        "full_name": c.full_name,
+        "phone": c.phone,
+        "total_orders": c.total_orders,
+        "total_spent": c.total_spent,
+        "loyalty_points": c.loyalty_points,
+        "created_at": c.created_at,
+    }
 
 
 def _product_summary(p: Any) -> dict[str, Any]:
@@ -456,26 +580,42 @@ def _product_summary(p: Any) -> dict[str, Any]:
 # HTTP Application (SSE transport + health endpoint)
 # ─────────────────────────────────────────────────────────────────────────────
 
-async def health_check(request: Request) -> JSONResponse:
-    return JSONResponse({"status": "healthy", "service": "ecommerce-mcp-server", "tools": 9})
+# Static per process, so encoded once instead of on every probe.
+_HEALTH_BODY = dumps_bytes(
+    {"status": "healthy", "service": "ecommerce-mcp-server", "tools": len(TOOLS)}
+)
+
 
+async def health_check(request: Request) -> Response:
+    return Response(_HEALTH_BODY, media_type="application/json")
 
-async def handle_tool_call(request: Request) -> JSONResponse:
-    """Direct HTTP endpoint for tool calling (compatibility with existing agents)."""
+
+async def handle_tool_call(request: Request) -> Response:
+    """Direct HTTP endpoint for tool calling (compatibility with existing agents).
+
+    Speaks JSON by default; msgpack bodies and ``Accept: application/msgpack``
+    are honoured when the optional ``msgpack`` dependency is installed.
+    """
+    respond = (
+        MsgpackResponse if MSGPACK in request.headers.get("accept", "") else ORJSONResponse
+    )
     try:
-        body = await request.json()
+        if request.headers.get("content-type", "").startswith(MSGPACK):
+            body = loads_msgpack(await request.body())
+        else:
+            body = await request.json()
         name = body.get("name")
         arguments = body.get("arguments", {})
 
         if not name:
-            return JSONResponse({"error": "Tool name is required"}, status_code=400)
+            return respond({"error": "Tool name is required"}, status_code=400)
 
         logger.info("direct_tool_call_received", tool=name, args=arguments)
         result = await _dispatch_tool(name, arguments)
-        return JSONResponse(result)
+        return respond(result)
     except Exception as e:
         logger.error("direct_tool_call_error", error=str(e))
-        return JSONResponse({"error": str(e)}, status_code=500)
+        return ORJSONResponse({"error": str(e)}, status_code=500)
 
 
 def build_starlette_app() -> Starlette:
@@ -495,6 +635,8 @@ def build_starlette_app() -> Starlette:
             Route("/tool", endpoint=handle_tool_call, methods=["POST"]),
             Mount("/messages/", app=sse.handle_post_message),
         ],
+        # Compresses large /tool replies; Starlette never compresses the SSE stream.
+        middleware=[Middleware(GZipMiddleware, minimum_size=1024)],
     )
 
 
@@ -511,6 +653,8 @@ def main() -> None:
         host=settings.mcp_server_host,
         port=settings.mcp_server_port,
         log_level=settings.log_level.lower(),
+        loop="uvloop",
+        http="httptools",
     )
 
 
@@ -7,18 +7,21 @@ Usage:
   python scripts/test_client.py              # Run all tests
   python scripts/test_client.py --chat       # Interactive chat mode
   python scripts/test_client.py --agent product  # Test specific agent
+  python scripts/test_client.py --no-cache   # Ignore cached agent replies
 """
 from __future__ import annotations
 
 import argparse
 import asyncio
 import sys
+import time
 from pathlib import Path
 import uuid
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import httpx
+import orjson
 from a2a.client import A2AClient
 from a2a.types import MessageSendParams, SendMessageRequest
 from a2a.utils import new_agent_text_message
@@ -59,46 +62,76 @@ TEST_QUERIES = {
 }
 
 
-async def send_a2a_message(agent_url: str, query: str) -> str:
-    """Send a message to an A2A agent and return the response."""
-    async with httpx.AsyncClient(timeout=60.0) as httpx_client:
+# Test-run replies are cached so repeated runs skip agents whose answers are
+# already known. Interactive chat never uses the cache.
+CACHE_PATH = Path(__file__).parent.parent / ".a2a_cache.json"
+CACHE_TTL = 3600.0
+
+
+class ResponseCache:
+    """Exact-match cache of agent replies keyed on (agent URL, query), stored as JSON."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = CACHE_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
         try:
-            client = A2AClient(
-                httpx_client = httpx_client, 
-                url = agent_url
-            )
-            request = SendMessageRequest(
-                id=str(uuid.uuid4()), 
-                params=MessageSendParams(
-                    message=new_agent_text_message(query),
-                )
+            self._entries: dict[str, list] = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(agent_url: str, query: str) -> str:
+        return f"{agent_url}\n{query}"
+
+    def get(self, agent_url: str, query: str) -> str | None:
+        entry = self._entries.get(self._key(agent_url, query))
+        if entry is None or entry[0] + self.ttl <= time.time():
+            return None
+        return entry[1]
+
+    def set(self, agent_url: str, query: str, response: str) -> None:
+        self._entries[self._key(agent_url, query)] = [time.time(), response]
+
+    def save(self) -> None:
+        self.path.write_bytes(orjson.dumps(self._entries))
+
+
+async def send_a2a_message(http: httpx.AsyncClient, agent_url: str, query: str) -> str:
+    """Send a message to an A2A agent and return the response."""
+    try:
+        client = A2AClient(httpx_client=http, url=agent_url)
+        request = SendMessageRequest(
+            id=str(uuid.uuid4()), 
+            params=MessageSendParams(
+                message=new_agent_text_message(query),
             )
-            response = await client.send_message(request)
-
-            result_text = ""
-            if hasattr(response, "root"):
-                resp_root = response.root
-                if hasattr(resp_root, "result"):
-                    result = resp_root.result
-                    if hasattr(result, "artifacts") and result.artifacts:
-                        for artifact in result.artifacts:
-                            if hasattr(artifact, "parts"):
-                                for part in artifact.parts:
-                                    if hasattr(part, "root") and hasattr(part.root, "text"):
-                                        result_text += part.root.text
-                    elif hasattr(result, "status") and result.status and result.status.message:
-                        msg = result.status.message
-                        if hasattr(msg, "parts"):
-                            for part in msg.parts:
+        )
+        response = await client.send_message(request)
+
+        result_text = ""
+        if hasattr(response, "root"):
+            resp_root = response.root
+            if hasattr(resp_root, "result"):
+                result = resp_root.result
+                if hasattr(result, "artifacts") and result.artifacts:
+                    for artifact in result.artifacts:
+                        if hasattr(artifact, "parts"):
+                            for part in artifact.parts:
                                 if hasattr(part, "root") and hasattr(part.root, "text"):
                                     result_text += part.root.text
+                elif hasattr(result, "status") and result.status and result.status.message:
+                    msg = result.status.message
+                    if hasattr(msg, "parts"):
+                        for part in msg.parts:
+                            if hasattr(part, "root") and hasattr(part.root, "text"):
+                                result_text += part.root.text
 
-            return result_text or "(Yanıt alınamadı)"
-        except Exception as e:
-            return f"❌ Hata: {e}"
+        return result_text or "(Yanıt alınamadı)"
+    except Exception as e:
+        return f"❌ Hata: {e}"
 
 
-async def check_health() -> None:
+async def check_health(client: httpx.AsyncClient) -> None:
     """Check health of all services."""
     console.print("\n[bold blue]🏥 Servis Sağlık Kontrolü[/bold blue]")
     table = Table(show_header=True, header_style="bold magenta")
@@ -114,38 +147,42 @@ async def check_health() -> None:
         ("Search Agent", "http://localhost:8004/.well-known/agent.json"),
     ]
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for name, url in checks:
-            try:
-                resp = await client.get(url)
-                status = "✅ Online" if resp.status_code == 200 else f"⚠️ {resp.status_code}"
-            except Exception as e:
-                status = f"❌ Offline ({str(e)[:30]})"
-            table.add_row(name, url, status)
+    for name, url in checks:
+        try:
+            resp = await client.get(url, timeout=5.0)
+            status = "✅ Online" if resp.status_code == 200 else f"⚠️ {resp.status_code}"
+        except Exception as e:
+            status = f"❌ Offline ({str(e)[:30]})"
+        table.add_row(name, url, status)
 
     console.print(table)
 
 
-async def test_rest_api() -> None:
+async def test_rest_api(client: httpx.AsyncClient | None = None) -> None:
     """Test the REST chat API."""
+    if client is None:
+        # Collected and run standalone by pytest, without the shared client.
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            return await test_rest_api(client)
     console.print("\n[bold blue]🌐 REST API Testi[/bold blue]")
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            resp = await client.post(
-                "http://localhost:8000/api/chat",
-                json={"message": "Merhaba! Bana en popüler elektronik ürünü öner."},
-            )
-            data = resp.json()
-            console.print(Panel(
-                Markdown(data.get("response", "Yanıt yok")),
-                title="REST API Yanıtı",
-                border_style="green",
-            ))
-        except Exception as e:
-            console.print(f"[red]REST API hatası: {e}[/red]")
+    try:
+        resp = await client.post(
+            "http://localhost:8000/api/chat",
+            json={"message": "Merhaba! Bana en popüler elektronik ürünü öner."},
+        )
+        data = resp.json()
+        console.print(Panel(
+            Markdown(data.get("response", "Yanıt yok")),
+            title="REST API Yanıtı",
+            border_style="green",
+        ))
+    except Exception as e:
+        console.print(f"[red]REST API hatası: {e}[/red]")
 
 
-async def run_agent_tests(agent_name: str) -> None:
+async def run_agent_tests(
+    client: httpx.AsyncClient, agent_name: str, cache: ResponseCache | None = None
+) -> None:
     """Test a specific agent."""
     agent_url = AGENTS.get(agent_name)
     if not agent_url:
@@ -153,20 +190,28 @@ async def run_agent_tests(agent_name: str) -> None:
         return
 
     queries = TEST_QUERIES.get(agent_name, [])
-    console.print(f"\n[bold blue]🤖 {agent_name.title()} Agent Testi[/bold blue]")
+    responses = [cache.get(agent_url, q) if cache else None for q in queries]
+    misses = [i for i, response in enumerate(responses) if response is None]
+    # Queries run concurrently; output is printed afterwards so it stays in order.
+    fetched = await asyncio.gather(
+        *(send_a2a_message(client, agent_url, queries[i]) for i in misses)
+    )
+    for i, response in zip(misses, fetched):
+        responses[i] = response
+        if cache and not response.startswith("❌"):
+            cache.set(agent_url, queries[i], response)
 
-    for query in queries:
+    console.print(f"\n[bold blue]🤖 {agent_name.title()} Agent Testi[/bold blue]")
+    for query, response in zip(queries, responses):
         console.print(f"\n[bold yellow]📤 Soru:[/bold yellow] {query}")
-        response = await send_a2a_message(agent_url, query)
         console.print(Panel(
             Markdown(response[:2000] + "..." if len(response) > 2000 else response),
             title=f"{agent_name.title()} Agent Yanıtı",
             border_style="cyan",
         ))
-        await asyncio.sleep(1)
 
 
-async def interactive_chat() -> None:
+async def interactive_chat(client: httpx.AsyncClient) -> None:
     """Interactive chat mode with the orchestrator."""
     console.print(Panel(
         "[bold green]E-Commerce AI Asistan[/bold green]\n"
@@ -190,7 +235,7 @@ async def interactive_chat() -> None:
                 continue
 
             console.print("[dim]Düşünüyorum...[/dim]")
-            response = await send_a2a_message(AGENTS["orchestrator"], user_input)
+            response = await send_a2a_message(client, AGENTS["orchestrator"], user_input)
             console.print(Panel(
                 Markdown(response),
                 title="🤖 Asistan",
@@ -210,6 +255,7 @@ async def main() -> None:
         help="Test a specific agent",
     )
     parser.add_argument("--health", action="store_true", help="Check service health only")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached agent replies")
     args = parser.parse_args()
 
     console.print(Panel(
@@ -219,21 +265,30 @@ async def main() -> None:
         border_style="magenta",
     ))
 
-    if args.health:
-        await check_health()
-        return
-
-    await check_health()
-
-    if args.chat:
-        await interactive_chat()
-    elif args.agent:
-        await run_agent_tests(args.agent)
-    else:
-        # Run all tests
-        await test_rest_api()
-        for agent_name in ["product", "order", "search", "orchestrator"]:
-            await run_agent_tests(agent_name)
+    # One client for the whole run, so connections are reused across calls.
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        await check_health(client)
+        if args.health:
+            return
+
+        if args.chat:
+            await interactive_chat(client)
+            return
+
+        cache = None if args.no_cache else ResponseCache()
+        if args.agent:
+            await run_agent_tests(client, args.agent, cache)
+        else:
+            # Run all tests
+            await asyncio.gather(
+                test_rest_api(client),
+                *(
+                    run_agent_tests(client, name, cache)
+                    for name in ["product", "order", "search", "orchestrator"]
+                ),
+            )
+        if cache:
+            cache.save()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,12 @@
-import requests
 import json
 
+import httpx
+import orjson
+import pytest
+
+# One pooled, keep-alive client for every request this module sends.
+CLIENT = httpx.Client(limits=httpx.Limits(max_keepalive_connections=20, max_connections=100))
+
 def test_tool_endpoint():
     url = "http://localhost:8090/tool"
     payload = {
@@ -11,17 +17,47 @@ def test_tool_endpoint():
     print(f"Testing POST {url} with payload {json.dumps(payload)}")
     
     try:
-        response = requests.post(url, json=payload)
+        response = CLIENT.post(url, json=payload)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
             print("Success! Response:")
-            print(json.dumps(response.json(), indent=2, ensure_ascii=False))
+            data = orjson.loads(response.content)
+            print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
         else:
             print(f"Error: {response.text}")
             
     except Exception as e:
         print(f"Failed to connect to server: {e}")
 
+def test_tool_endpoint_msgpack():
+    ormsgpack = pytest.importorskip("ormsgpack")
+    url = "http://localhost:8090/tool"
+    payload = {
+        "name": "search_products",
+        "arguments": {"query": "laptop"}
+    }
+
+    print(f"Testing POST {url} with msgpack payload {json.dumps(payload)}")
+
+    try:
+        response = CLIENT.post(
+            url,
+            content=ormsgpack.packb(payload),
+            headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+        )
+        print(f"Status Code: {response.status_code}")
+
+        if response.status_code == 200:
+            print("Success! Response:")
+            data = ormsgpack.unpackb(response.content)
+            print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+        else:
+            print(f"Error: {response.text}")
+
+    except Exception as e:
+        print(f"Failed to connect to server: {e}")
+
 if __name__ == "__main__":
     test_tool_endpoint()
+    test_tool_endpoint_msgpack()
@@ -0,0 +1,27 @@
+"""Pre-encoded A2A agent card routes shared by the agent servers."""
+from __future__ import annotations
+
+from a2a.types import AgentCard
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH, PREV_AGENT_CARD_WELL_KNOWN_PATH
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from utils.serialization import dumps_bytes
+
+
+def agent_card_routes(card: AgentCard) -> list[Route]:
+    """Return routes serving ``card`` on both well-known paths from cached bytes.
+
+    Registered ahead of the A2A app's own card routes, which re-dump the model
+    on every request. The encoding matches the SDK (``exclude_none``, aliases).
+    """
+    body = dumps_bytes(card.model_dump(mode="json", exclude_none=True, by_alias=True))
+
+    async def agent_card_endpoint(request: Request) -> Response:
+        return Response(body, media_type="application/json")
+
+    return [
+        Route(AGENT_CARD_WELL_KNOWN_PATH, endpoint=agent_card_endpoint, methods=["GET"]),
+        Route(PREV_AGENT_CARD_WELL_KNOWN_PATH, endpoint=agent_card_endpoint, methods=["GET"]),
+    ]
@@ -0,0 +1,50 @@
+"""Request coalescing for identical concurrent calls."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Coalescer(Generic[T]):
+    """Run identical concurrent calls once and hand the result to every caller.
+
+    The first caller for a key opens a short ``window`` during which identical
+    calls join it; the call then runs once and its result (or exception) fans
+    out to all waiters. Calls arriving while it is still in flight join too.
+    Only use for idempotent, read-only calls.
+    """
+
+    def __init__(self, window: float = 0.005) -> None:
+        self._window = window
+        self._inflight: dict[Hashable, asyncio.Future[T]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            task = asyncio.create_task(self._flush(key, future, call))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        # Shielded so one cancelled caller does not cancel the shared call.
+        return await asyncio.shield(future)
+
+    async def _flush(
+        self, key: Hashable, future: asyncio.Future[T], call: Callable[[], Awaitable[T]]
+    ) -> None:
+        try:
+            if self._window > 0:
+                await asyncio.sleep(self._window)
+            future.set_result(await call())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a call with no remaining waiters does not warn.
+            future.exception()
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,99 @@
+"""Small in-process caches shared by the agents."""
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from operator import mul
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache whose entries expire ``ttl`` seconds after insertion.
+
+    Only used from a single event loop, so no locking is needed: none of the
+    operations below await.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def values(self) -> list[V]:
+        """Return all live values, dropping expired entries on the way."""
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+        for k in expired:
+            del self._data[k]
+        return [value for _, value in self._data.values()]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SemanticCache:
+    """Cache answers for queries whose embeddings are near-duplicates.
+
+    ``embed`` maps a query to its embedding. Vectors are L2-normalized when
+    stored, so a dot product is the cosine similarity. The scan is linear,
+    which is fine for the few hundred entries kept here.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[list[float]]],
+        threshold: float = 0.92,
+        maxsize: int = 256,
+        ttl: float = 300.0,
+    ) -> None:
+        self._embed = embed
+        self.threshold = threshold
+        self._entries: TTLCache[str, tuple[list[float], str]] = TTLCache(maxsize, ttl)
+        # Remembers vectors computed during lookup so insert does not re-embed.
+        self._vectors: TTLCache[str, list[float]] = TTLCache(maxsize, ttl)
+
+    async def _vector(self, key: str, query: str) -> list[float]:
+        vec = self._vectors.get(key)
+        if vec is None:
+            raw = await self._embed(query)
+            norm = math.sqrt(sum(x * x for x in raw)) or 1.0
+            vec = [x / norm for x in raw]
+            self._vectors.set(key, vec)
+        return vec
+
+    async def lookup(self, key: str, query: str) -> str | None:
+        vec = await self._vector(key, query)
+        best_score, best = self.threshold, None
+        for entry_vec, response in self._entries.values():
+            score = sum(map(mul, vec, entry_vec))
+            if score >= best_score:
+                best_score, best = score, response
+        return best
+
+    async def insert(self, key: str, query: str, response: str) -> None:
+        self._entries.set(key, (await self._vector(key, query), response))
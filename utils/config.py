@@ -9,16 +9,23 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore", frozen=True
+    )
 
     # ── LLM ──────────────────────────────────────────────────────────────────
     openai_api_key: str = Field(default="", description="OpenAI API key")
     llm_model: str = Field(default="gpt-4o-mini-2024-07-18", description="LLM model name")
     llm_temperature: float = Field(default=0.1)
     llm_max_tokens: int = Field(default=4096)
+    router_llm_model: str = Field(
+        default="gpt-4o-mini-2024-07-18", description="Cheap model for the orchestrator's routing turn"
+    )
 
     # ── Tavily Web Search ─────────────────────────────────────────────────────
     tavily_api_key: str = Field(default="", description="Tavily API key for web search")
+    tavily_max_concurrency: int = Field(default=8, description="Concurrent Tavily requests")
+    max_concurrent_searches: int = Field(default=16, description="Concurrent search agent runs")
 
     # ── MCP Server ────────────────────────────────────────────────────────────
     mcp_server_host: str = Field(default="0.0.0.0")
@@ -41,10 +48,35 @@ class Settings(BaseSettings):
 
     # ── Redis ─────────────────────────────────────────────────────────────────
     redis_url: Optional[str] = Field(default=None)
+    task_store_max_size: int = Field(default=10_000, description="In-memory A2A tasks kept")
+
+    # ── Caching ───────────────────────────────────────────────────────────────
+    response_cache_size: int = Field(default=2048)
+    response_cache_ttl: float = Field(default=300.0, description="Seconds")
+    semantic_cache_enabled: bool = Field(default=False)
+    semantic_cache_threshold: float = Field(default=0.92, description="Min cosine similarity")
+    embedding_model: str = Field(default="text-embedding-3-small")
+    embedding_dimensions: int = Field(default=256)
+    plan_cache_enabled: bool = Field(default=True)
+    direct_routing_enabled: bool = Field(default=True)
+    llm_cache_enabled: bool = Field(default=True, description="Cache agent LLM replies")
+    llm_cache_ttl: float = Field(default=3600.0, description="Seconds")
+    semantic_routing_enabled: bool = Field(default=False)
+    semantic_routing_threshold: float = Field(default=0.9, description="Min cosine similarity")
+
+    # ── REST chat ─────────────────────────────────────────────────────────────
+    allow_message_coalescing: bool = Field(default=True)
+    conversation_memory_enabled: bool = Field(
+        default=True, description="Keep orchestrator state per session across turns"
+    )
+    conversation_max_threads: int = Field(
+        default=1000, description="Conversation threads kept in memory"
+    )
 
     # ── App ───────────────────────────────────────────────────────────────────
     log_level: str = Field(default="INFO")
     environment: str = Field(default="development")
+    max_query_chars: int = Field(default=8000, description="Longest user query agents accept")
     api_secret_key: str = Field(default="change-me-in-production-32-chars!!")
 
     # ── LangChain ─────────────────────────────────────────────────────────────
@@ -0,0 +1,94 @@
+"""Response cache for chat model calls inside agent graphs."""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from utils.cache import SemanticCache, TTLCache
+from utils.logging import get_logger
+from utils.serialization import dumps
+
+logger = get_logger(__name__)
+
+
+def _fingerprint(msg: BaseMessage) -> list:
+    """Reduce a message to the fields that influence the model's reply.
+
+    Message ids, tool call ids and provider metadata change on every run and
+    would make otherwise identical conversations miss.
+    """
+    if isinstance(msg, AIMessage):
+        calls = [(c["name"], c["args"]) for c in msg.tool_calls]
+        return [msg.type, msg.content, calls]
+    if isinstance(msg, ToolMessage):
+        return [msg.type, msg.content, msg.name]
+    return [msg.type, msg.content]
+
+
+class LLMCache:
+    """Two-tier cache of ``AIMessage`` replies for one model configuration.
+
+    Tier one is an exact match on a SHA-256 of the model, temperature, bound
+    tool names and the conversation. Tier two, when ``semantic`` is given,
+    matches rephrasings of a single-question conversation by embedding. It
+    only serves plain text replies: a tool call carries arguments taken from
+    the original wording (a price limit, an order id), which a merely similar
+    question must not reuse.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        temperature: float,
+        tool_names: Iterable[str],
+        maxsize: int = 1024,
+        ttl: float = 3600.0,
+        semantic: SemanticCache | None = None,
+    ) -> None:
+        self._prefix = dumps([model, temperature, sorted(tool_names)])
+        self._exact: TTLCache[str, AIMessage] = TTLCache(maxsize, ttl)
+        self._semantic = semantic
+
+    def key(self, messages: Sequence[BaseMessage]) -> str:
+        payload = dumps([self._prefix, [_fingerprint(m) for m in messages]])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _single_query(messages: Sequence[BaseMessage]) -> str | None:
+        """Return the question of a fresh one-message conversation, if it is one."""
+        turns = [m for m in messages if m.type != "system"]
+        if len(turns) == 1 and isinstance(turns[0], HumanMessage):
+            content = turns[0].content
+            return content if isinstance(content, str) else None
+        return None
+
+    async def get(self, messages: Sequence[BaseMessage]) -> AIMessage | None:
+        key = self.key(messages)
+        cached = self._exact.get(key)
+        if cached is None and self._semantic is not None:
+            query = self._single_query(messages)
+            if query is not None:
+                try:
+                    # The semantic tier stores exact-tier keys, not replies.
+                    similar_key = await self._semantic.lookup(key, query)
+                except Exception as e:
+                    logger.warning("llm_semantic_cache_error", error=str(e))
+                else:
+                    cached = self._exact.get(similar_key) if similar_key else None
+                    if cached is not None and cached.tool_calls:
+                        cached = None
+        # A fresh id keeps add_messages from treating the reply as an update.
+        return cached.model_copy(update={"id": None}) if cached is not None else None
+
+    async def set(self, messages: Sequence[BaseMessage], response: AIMessage) -> None:
+        key = self.key(messages)
+        self._exact.set(key, response)
+        if self._semantic is not None and not response.tool_calls:
+            query = self._single_query(messages)
+            if query is not None:
+                try:
+                    await self._semantic.insert(key, query, key)
+                except Exception as e:
+                    logger.warning("llm_semantic_cache_error", error=str(e))
@@ -3,31 +3,55 @@ from __future__ import annotations
 
 import logging
 import sys
+from collections.abc import Callable
+from functools import cache
+from typing import Any
 
+import orjson
 import structlog
 
+_effective_level = logging.INFO
+
 
 def configure_logging(level: str = "INFO", service_name: str = "ecommerce-agent") -> None:
     """Configure structlog for the service."""
+    global _effective_level
+    _effective_level = getattr(logging, level.upper(), logging.INFO)
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, level.upper(), logging.INFO),
+        level=_effective_level,
     )
 
-    structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
+    processors: list[structlog.typing.Processor] = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+    ]
+    # JSON lines are rendered to bytes by orjson and written without decoding;
+    # the console renderer produces text, so it keeps the print logger. Stack
+    # rendering is a debugging aid, so only the DEBUG pipeline pays for it.
+    # JSON lines carry a UTC epoch timestamp and leave formatting to the collector.
+    if level == "DEBUG":
+        processors += [
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
-            structlog.dev.ConsoleRenderer() if level == "DEBUG" else structlog.processors.JSONRenderer(),
-        ],
-        wrapper_class=structlog.make_filtering_bound_logger(
-            getattr(logging, level.upper(), logging.INFO)
-        ),
+            structlog.dev.ConsoleRenderer(),
+        ]
+        logger_factory: Callable[..., Any] = structlog.PrintLoggerFactory()
+    else:
+        processors += [
+            structlog.processors.TimeStamper(fmt=None, utc=True),
+            structlog.processors.JSONRenderer(
+                serializer=orjson.dumps, option=orjson.OPT_NON_STR_KEYS
+            ),
+        ]
+        logger_factory = structlog.BytesLoggerFactory()
+
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(_effective_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
@@ -35,5 +59,16 @@ def configure_logging(level: str = "INFO", service_name: str = "ecommerce-agent"
     structlog.contextvars.bind_contextvars(service=service_name)
 
 
+def is_enabled_for(level: int) -> bool:
+    """Tell whether ``level`` passes the configured filter.
+
+    Lets call sites skip building expensive log payloads that the filtering
+    logger would drop anyway.
+    """
+    return level >= _effective_level
+
+
+@cache
 def get_logger(name: str) -> structlog.BoundLogger:
+    """Return the logger for ``name``; repeated calls share one proxy."""
     return structlog.get_logger(name)
@@ -1,12 +1,13 @@
 """Domain models utils across all agents."""
 from __future__ import annotations
 
-from datetime import datetime
+import secrets
+from datetime import UTC, datetime
 from enum import Enum
+from functools import cached_property
 from typing import Any, Optional
-from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -34,11 +35,27 @@ class ProductCategory(str, Enum):
     FOOD = "food"
 
 
+def _new_id() -> str:
+    """Return a random 128-bit id as 32 hex digits; cheaper than formatting a UUID."""
+    return secrets.token_hex(16)
+
+
+def _now() -> datetime:
+    """Current time as an aware UTC datetime (``datetime.utcnow`` is deprecated)."""
+    return datetime.now(UTC)
+
+
+class _Record(BaseModel):
+    """Base for catalog records; built once and never mutated afterwards."""
+
+    model_config = ConfigDict(frozen=True)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Product
 # ─────────────────────────────────────────────────────────────────────────────
 
-class ProductReview(BaseModel):
+class ProductReview(_Record):
     reviewer_name: str
     rating: float = Field(ge=1.0, le=5.0)
     comment: str
@@ -46,8 +63,8 @@ class ProductReview(BaseModel):
     date: str
 
 
-class Product(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid4()))
+class Product(_Record):
+    id: str = Field(default_factory=_new_id)
     name: str
     description: str
     category: ProductCategory
@@ -58,13 +75,14 @@ class Product(BaseModel):
     sku: str
     rating: float = Field(default=0.0, ge=0.0, le=5.0)
     review_count: int = Field(default=0)
-    reviews: list[ProductReview] = Field(default_factory=list)
-    tags: list[str] = Field(default_factory=list)
+    reviews: tuple[ProductReview, ...] = ()
+    tags: tuple[str, ...] = ()
     image_url: str = ""
     in_stock: bool = True
     specifications: dict[str, Any] = Field(default_factory=dict)
 
-    @property
+    # Cached on first access; safe because products are frozen.
+    @cached_property
     def discount_percentage(self) -> Optional[float]:
         if self.original_price and self.original_price > self.price:
             return round((1 - self.price / self.original_price) * 100, 1)
@@ -75,7 +93,7 @@ class Product(BaseModel):
 # Order
 # ─────────────────────────────────────────────────────────────────────────────
 
-class OrderItem(BaseModel):
+class OrderItem(_Record):
     product_id: str
     product_name: str
     quantity: int = Field(ge=1)
@@ -83,7 +101,7 @@ class OrderItem(BaseModel):
     total_price: float
 
 
-class ShippingAddress(BaseModel):
+class ShippingAddress(_Record):
     full_name: str
     street: str
     city: str
@@ -92,15 +110,15 @@ class ShippingAddress(BaseModel):
     country: str = "TR"
 
 
-class TrackingEvent(BaseModel):
+class TrackingEvent(_Record):
     timestamp: datetime
     status: str
     location: str
     description: str
 
 
-class Order(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid4()))
+class Order(_Record):
+    id: str = Field(default_factory=_new_id)
     customer_id: str
     customer_email: str
     items: list[OrderItem]
@@ -110,10 +128,10 @@ class Order(BaseModel):
     shipping_cost: float = 0.0
     tax: float = 0.0
     total: float
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
+    updated_at: datetime = Field(default_factory=_now)
     tracking_number: Optional[str] = None
-    tracking_events: list[TrackingEvent] = Field(default_factory=list)
+    tracking_events: tuple[TrackingEvent, ...] = ()
     estimated_delivery: Optional[str] = None
     notes: Optional[str] = None
 
@@ -122,15 +140,15 @@ class Order(BaseModel):
 # Customer
 # ─────────────────────────────────────────────────────────────────────────────
 
-class Customer(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid4()))
+class Customer(_Record):
+    id: str = Field(default_factory=_new_id)
     email: str
     full_name: str
     phone: Optional[str] = None
     total_orders: int = 0
     total_spent: float = 0.0
     loyalty_points: int = 0
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_now)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,51 @@
+"""Embedding-based routing of queries to known intents."""
+from __future__ import annotations
+
+import math
+from collections.abc import Awaitable, Callable
+from operator import mul
+
+
+def _normalize(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+class EmbeddingRouter:
+    """Pick the route whose exemplar queries are closest to the incoming one.
+
+    Exemplars are embedded once, on first use, with ``embed_documents``; each
+    query then costs one ``embed_query`` call and a dot product per exemplar.
+    Returns ``None`` when no exemplar reaches ``threshold`` cosine similarity.
+    """
+
+    def __init__(
+        self,
+        embed_documents: Callable[[list[str]], Awaitable[list[list[float]]]],
+        embed_query: Callable[[str], Awaitable[list[float]]],
+        routes: dict[str, list[str]],
+        threshold: float = 0.9,
+    ) -> None:
+        self._embed_documents = embed_documents
+        self._embed_query = embed_query
+        self._routes = routes
+        self.threshold = threshold
+        self._exemplars: list[tuple[str, list[float]]] | None = None
+
+    async def _load(self) -> list[tuple[str, list[float]]]:
+        if self._exemplars is None:
+            names = [name for name, texts in self._routes.items() for _ in texts]
+            texts = [text for texts in self._routes.values() for text in texts]
+            vectors = await self._embed_documents(texts)
+            self._exemplars = [(n, _normalize(v)) for n, v in zip(names, vectors)]
+        return self._exemplars
+
+    async def route(self, query: str) -> str | None:
+        exemplars = await self._load()
+        vec = _normalize(await self._embed_query(query))
+        best_score, best = self.threshold, None
+        for name, exemplar in exemplars:
+            score = sum(map(mul, vec, exemplar))
+            if score >= best_score:
+                best_score, best = score, name
+        return best
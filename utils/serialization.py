@@ -0,0 +1,51 @@
+"""Fast JSON (and optional msgpack) serialization shared by agents and the MCP server."""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse, Response
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a JSON string with orjson.
+
+    Output is UTF-8 (equivalent to ``json.dumps(..., ensure_ascii=False)``);
+    datetimes and enums are handled natively, anything else falls back to ``str``.
+    """
+    return orjson.dumps(obj, default=str, option=_OPTIONS).decode()
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Like :func:`dumps` but returns the encoded bytes (for HTTP bodies)."""
+    return orjson.dumps(obj, default=str, option=_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """Starlette ``JSONResponse`` that renders with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+MSGPACK = "application/msgpack"
+
+
+class MsgpackResponse(Response):
+    """Response rendered with ormsgpack. Requires the optional ``msgpack`` dependency."""
+
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        import ormsgpack
+
+        return ormsgpack.packb(content, default=str, option=ormsgpack.OPT_NON_STR_KEYS)
+
+
+def loads_msgpack(data: bytes) -> Any:
+    """Decode a msgpack body. Requires the optional ``msgpack`` dependency."""
+    import ormsgpack
+
+    return ormsgpack.unpackb(data)
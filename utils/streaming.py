@@ -0,0 +1,39 @@
+"""Batched forwarding of streamed model tokens as A2A status updates."""
+from __future__ import annotations
+
+import time
+
+from a2a.server.tasks import TaskUpdater
+from a2a.types import TaskState, TextPart
+
+
+class TokenBatcher:
+    """Send streamed tokens as one ``working`` status update per ``interval``.
+
+    The SDK moves every status message into ``task.history`` and saves the
+    whole task again, so one update per token makes each reply quadratic in
+    its length. Tokens are buffered and flushed at most every ``interval``
+    seconds; call :meth:`flush` once the stream ends to send the tail.
+    """
+
+    def __init__(self, updater: TaskUpdater, interval: float = 0.1) -> None:
+        self._updater = updater
+        self._interval = interval
+        self._parts: list[str] = []
+        self._last_flush = time.monotonic()
+
+    async def add(self, text: str) -> None:
+        self._parts.append(text)
+        if time.monotonic() - self._last_flush >= self._interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._parts:
+            return
+        text = "".join(self._parts)
+        self._parts.clear()
+        await self._updater.update_status(
+            TaskState.working,
+            message=self._updater.new_agent_message(parts=[TextPart(text=text)]),
+        )
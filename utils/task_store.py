@@ -0,0 +1,83 @@
+"""A2A task stores shared by the agent servers."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+
+from utils.config import get_settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LRUTaskStore(TaskStore):
+    """
+    In-memory task store that keeps at most ``max_size`` tasks.
+
+    The least recently saved or read task is evicted first, so a long-running
+    process does not accumulate every task it has ever handled. None of the
+    methods await, so no lock is needed.
+    """
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self.max_size = max_size
+        self.tasks: OrderedDict[str, Task] = OrderedDict()
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        self.tasks[task.id] = task
+        self.tasks.move_to_end(task.id)
+        while len(self.tasks) > self.max_size:
+            self.tasks.popitem(last=False)
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        task = self.tasks.get(task_id)
+        if task is not None:
+            self.tasks.move_to_end(task_id)
+        return task
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        self.tasks.pop(task_id, None)
+
+
+class RedisTaskStore(TaskStore):
+    """
+    Task store backed by Redis, so several server workers can share task state.
+
+    Tasks are stored as JSON under ``task:{task_id}`` and expire after ``ttl``
+    seconds. Requires the optional ``redis`` dependency.
+    """
+
+    def __init__(self, url: str, ttl: int = 3600, max_connections: int = 50) -> None:
+        from redis.asyncio import ConnectionPool, Redis
+
+        self._redis: Any = Redis(
+            connection_pool=ConnectionPool.from_url(url, max_connections=max_connections)
+        )
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        return f"task:{task_id}"
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        await self._redis.set(self._key(task.id), task.model_dump_json(), ex=self._ttl)
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        raw = await self._redis.get(self._key(task_id))
+        return Task.model_validate_json(raw) if raw is not None else None
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        await self._redis.delete(self._key(task_id))
+
+
+def build_task_store() -> TaskStore:
+    """Return a Redis task store when ``REDIS_URL`` is set, else a bounded in-memory one."""
+    settings = get_settings()
+    if settings.redis_url:
+        logger.info("task_store_redis")
+        return RedisTaskStore(settings.redis_url)
+    return LRUTaskStore(settings.task_store_max_size)